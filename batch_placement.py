@@ -0,0 +1,147 @@
+import numpy as np
+
+import kernels
+from graph_index import index_graph
+from distance_matrix import as_latency, csr_matrix, distance_matrix, hop_dtype, to_csgraph, unreachable
+from placement import CHUNK_ELEMENTS, random_placements
+
+try:
+    from scipy.sparse.csgraph import shortest_path
+except ImportError:
+    shortest_path = None
+
+# Graphs per size group when scoring without numba
+GROUP_GRAPHS = 16
+
+
+# (G, N, N) distance matrices padded to the largest graph, in one dtype
+# wide enough for all of them. Rows of padding nodes are 0 so they never
+# raise a max; their columns are never chosen. With numba every graph is
+# solved in a single compiled call over their block-diagonal union.
+def stack_distances(igs):
+    sizes = np.array([ig.num_nodes for ig in igs])
+    weighted = any(ig.weights is not None for ig in igs)
+    dtype = np.dtype(np.float32) if weighted else hop_dtype(max(sizes.max() - 1, 0))
+
+    if kernels.USE_NUMBA:
+        offsets = np.concatenate([[0], np.cumsum(sizes)])
+        edge_offsets = np.concatenate([[0], np.cumsum([len(ig.indices) for ig in igs])])
+        indptr = np.concatenate([ig.indptr[:-1] + edge_offsets[g] for g, ig in enumerate(igs)] + [edge_offsets[-1:]])
+        indices = np.concatenate([ig.indices + offsets[g] for g, ig in enumerate(igs)])
+        weights = np.concatenate([ig.weights if ig.weights is not None else np.ones(len(ig.indices))
+                                  for ig in igs]) if weighted else np.empty(0)
+        D = kernels.stacked_all_pairs(indptr, indices, weights, offsets, sizes.max(), weighted)
+        if dtype.kind == 'f':
+            return D
+        return np.where(np.isinf(D), unreachable(dtype), D).astype(dtype)
+
+    D = np.zeros((len(igs), sizes.max(), sizes.max()), dtype=dtype)
+    for g, ig in enumerate(igs):
+        if csr_matrix is not None:
+            # Straight to scipy: the common dtype makes matrix_dtype's hop bound unnecessary
+            single = shortest_path(to_csgraph(ig), directed=False, unweighted=not weighted)
+            single[np.isinf(single)] = unreachable(dtype)
+        else:
+            single = distance_matrix(ig)
+            single = np.where(single == unreachable(single.dtype), unreachable(dtype), single)
+        D[g, :sizes[g], :sizes[g]] = single
+    return D
+
+
+# (G, P, K) random placements: graph g gets ks[g] distinct nodes below
+# sizes[g]; unused slots up to K = max(ks) repeat the first controller.
+# With numba every row is a partial Fisher-Yates shuffle, O(k) each.
+# Otherwise, where k * k <= n a row is duplicate-free with probability above ~0.6, so
+# rows are drawn with replacement and redrawn while they hold a duplicate,
+# which is far cheaper than partitioning keys. Denser graphs, where
+# rejection would rarely or never succeed, use random_placements.
+def batch_placements(rng, sizes, ks, num_placements):
+    sizes, ks = np.asarray(sizes), np.asarray(ks)
+    k = ks.max()
+    if kernels.USE_NUMBA:
+        return kernels.sample_placements(rng.random((len(sizes), num_placements, k)), sizes, ks)
+    used = np.arange(k) < ks[:, None]
+    # Unused slots hold distinct negative values so they never look duplicated
+    padding = np.where(used, 0, -1 - np.arange(k)).astype(np.int32)
+
+    def draw(graphs):
+        fresh = (rng.random((len(graphs), k), dtype=np.float32) * sizes[graphs, None]).astype(np.int32)
+        return np.where(used[graphs], fresh, padding[graphs])
+
+    placements = draw(np.repeat(np.arange(len(sizes)), num_placements)).reshape(len(sizes), num_placements, k)
+    sparse = ks * ks <= sizes
+    for g in np.flatnonzero(~sparse):
+        placements[g, :, :ks[g]] = random_placements(rng, sizes[g], ks[g], num_placements)
+    redraw = np.repeat(sparse[:, None], num_placements, axis=1)
+    while redraw.any():
+        rows = np.sort(placements[redraw], axis=1)
+        redraw[redraw] = (rows[:, 1:] == rows[:, :-1]).any(axis=1)
+        placements[redraw] = draw(np.nonzero(redraw)[0])
+    return np.where(used[:, None, :], placements, placements[:, :, :1])
+
+
+# (G, P) max latency of every graph's placements. The numba kernel reads
+# only each graph's own nodes and controllers. Otherwise graphs are scored
+# in groups of similar size, each group's stack cut to its largest graph,
+# with one vectorised gather per chunk of placements. Each matrix is
+# symmetric, so controllers' rows are gathered (contiguous) rather than
+# their columns.
+def score_batch(D, placements, sizes, ks):
+    sizes, ks = np.asarray(sizes), np.asarray(ks)
+    if kernels.USE_NUMBA:
+        return kernels.stacked_max_min_scores(D, placements, sizes, ks)
+    num_graphs, num_placements, _ = placements.shape
+    scores = np.empty((num_graphs, num_placements), dtype=D.dtype)
+    order = np.argsort(sizes, kind='stable')
+    for first in range(0, num_graphs, GROUP_GRAPHS):
+        group = order[first:first + GROUP_GRAPHS]
+        n, k = sizes[group].max(), ks[group].max()
+        stack = D[group, :n, :n]
+        graphs = np.arange(len(group))[:, None, None]
+        step = max(1, CHUNK_ELEMENTS // (len(group) * n * k))
+        for start in range(0, num_placements, step):
+            chunk = placements[group, start:start + step, :k]
+            # stack[graph, chunk] is (group, chunk, k, n)
+            scores[group, start:start + step] = stack[graphs, chunk].min(axis=2).max(axis=2)
+    return scores
+
+
+# Index and max latency of every graph's best placement. The numba kernel
+# abandons a placement as soon as it cannot beat the best so far, so most
+# are never scored in full; otherwise this is argmin over score_batch.
+def best_placements(D, placements, sizes, ks):
+    if kernels.USE_NUMBA:
+        return kernels.stacked_best_placements(D, placements, np.asarray(sizes), np.asarray(ks))
+    scores = score_batch(D, placements, sizes, ks)
+    best = np.argmin(scores, axis=1)
+    return best, scores[np.arange(len(best)), best]
+
+
+# Random-search placement for many small graphs at once: distance matrices
+# are stacked into one padded array and every graph's candidates are scored
+# together. num_controllers is one k for all graphs or one per graph.
+# Returns a (controllers, latency) pair per graph.
+#
+# Measured on 300 graphs of 20-100 nodes (k = 10% of n) against a loop of
+# place_controllers, single core:
+#     numba, hop counts:  ~9x at 10 trials, ~8.5x at 1000
+#     numba, latencies:   ~2x at 10 trials, ~2.7x at 1000 (APSP dominates)
+#     NumPy/SciPy:        ~1.3-2x
+# Most of the gain comes from pruned scoring and O(k) sampling, so it needs
+# numba; without it the batch mostly saves per-graph call overhead.
+def place_controllers_batch(graphs, num_controllers, trials=1000, weight=None, seed=None):
+    igs = [index_graph(G, weight=weight) for G in graphs]
+    sizes = [ig.num_nodes for ig in igs]
+    ks = np.broadcast_to(num_controllers, len(igs)).astype(np.int64)
+    if (ks > sizes).any():
+        raise ValueError("More controllers than nodes in a graph")
+    rng = np.random.default_rng(seed)
+
+    D = stack_distances(igs)
+    placements = batch_placements(rng, sizes, ks, trials)
+    best, scores = best_placements(D, placements, sizes, ks)
+    results = []
+    for g, ig in enumerate(igs):
+        controllers = placements[g, best[g], :ks[g]]
+        results.append((ig.to_labels(controllers), as_latency(scores[g], D.dtype)))
+    return results
@@ -0,0 +1,56 @@
+import time
+
+import numpy as np
+
+import kernels
+from distance_matrix import distance_matrix, nearest_source_distances
+from placement import random_placements, score_placements
+from topologies import generate_topology
+
+NUM_SWITCHES = 1000
+NUM_HOSTS = 4000
+NUM_CONTROLLERS = 10
+NUM_PLACEMENTS = 2048
+REPEATS = 5
+
+
+def best_time(function, repeats=REPEATS):
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+# Time one kernel with the compiled backend off and on; the first compiled
+# call is run untimed so JIT compilation is not counted
+def compare(name, function):
+    kernels.USE_NUMBA = False
+    fallback = best_time(function)
+    if not kernels.HAVE_NUMBA:
+        print(f"{name:<28} {fallback * 1e3:>10.2f} ms {'-':>10} {'-':>8}")
+        return
+    kernels.USE_NUMBA = True
+    function()
+    compiled = best_time(function)
+    print(f"{name:<28} {fallback * 1e3:>10.2f} ms {compiled * 1e3:>7.2f} ms {fallback / compiled:>7.1f}x")
+
+
+rng = np.random.default_rng(0)
+hops = generate_topology('erdos_renyi', NUM_SWITCHES, NUM_HOSTS, rng, connection_prob=0.005)
+latency = generate_topology('erdos_renyi', NUM_SWITCHES, NUM_HOSTS, rng, connection_prob=0.005, weighted=True)
+sources = rng.choice(hops.num_nodes, NUM_CONTROLLERS, replace=False)
+
+D_hops = distance_matrix(hops)
+D_latency = distance_matrix(latency)
+placements = random_placements(rng, hops.num_nodes, NUM_CONTROLLERS, NUM_PLACEMENTS)
+
+print(f"numba available: {kernels.HAVE_NUMBA}")
+print(f"{hops.num_nodes} nodes, {hops.num_edges} edges, k={NUM_CONTROLLERS}, {NUM_PLACEMENTS} placements")
+print(f"{'kernel':<28} {'fallback':>13} {'numba':>10} {'speedup':>8}")
+compare('multi-source BFS', lambda: nearest_source_distances(hops, sources))
+compare('multi-source Dijkstra', lambda: nearest_source_distances(latency, sources))
+compare('max-min scoring (uint8)', lambda: score_placements(D_hops, placements, 'max'))
+compare('max-min scoring (float32)', lambda: score_placements(D_latency, placements, 'max'))
+compare('avg scoring (float32)', lambda: score_placements(D_latency, placements, 'avg'))
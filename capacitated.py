@@ -0,0 +1,133 @@
+import time
+
+import numpy as np
+
+from graph_index import index_graph
+from distance_matrix import as_latency, distance_matrix, unreachable
+from placement import random_placements, reduce_nearest, score_dtype, score_placements
+
+
+# Switch-to-controller costs of a placement as float64. Unreachable pairs
+# get a finite penalty above any real latency so the flow stays well defined.
+def assignment_costs(D, controllers):
+    costs = D[:, controllers].astype(np.float64)
+    cut = D[:, controllers] == unreachable(D.dtype)
+    finite = costs[~cut]
+    costs[cut] = 2 * (finite.max() if finite.size else 1.0) + 1
+    return costs
+
+
+def _find_negative_cycle(W, tolerance):
+    # Bellman-Ford from a virtual source joined to every node at cost 0
+    size = len(W)
+    dist = np.zeros(size)
+    pred = np.full(size, -1)
+    updated = -1
+    for _ in range(size):
+        candidate = dist[:, None] + W
+        best = candidate.argmin(axis=0)
+        value = candidate[best, np.arange(size)]
+        improved = value < dist - tolerance
+        if not improved.any():
+            return None
+        dist[improved] = value[improved]
+        pred[improved] = best[improved]
+        updated = np.flatnonzero(improved)[0]
+
+    node = updated
+    for _ in range(size):
+        node = pred[node]
+    cycle = [node]
+    while True:
+        cycle.append(pred[cycle[-1]])
+        if cycle[-1] == node:
+            break
+    return cycle[::-1]
+
+
+# Min-cost assignment of every node to one controller slot with at most
+# capacity[slot] nodes each, by cycle cancelling on the residual graph of
+# controller slots plus a sink. A previous assignment (e.g. from a
+# neighbouring placement) can be passed to warm-start the search.
+def assign(costs, capacity, assignment=None):
+    n, k = costs.shape
+    capacity = np.broadcast_to(np.asarray(capacity, dtype=np.int64), (k,))
+    if n > capacity.sum():
+        raise ValueError(f"{n} nodes exceed the total controller capacity {capacity.sum()}")
+    assignment = costs.argmin(axis=1) if assignment is None else assignment.copy()
+
+    # Overflowing a controller costs more than any reassignment could save
+    overflow = (costs.max() - costs.min() + 1) * (n + 1)
+    tolerance = 1e-9 * max(1.0, costs.max())
+    sink = k
+    rows = np.arange(n)
+    while True:
+        load = np.bincount(assignment, minlength=k)
+        delta = costs - costs[rows, assignment][:, None]
+
+        # W[a, b]: cheapest move of one node from slot a to slot b
+        W = np.full((k + 1, k + 1), np.inf)
+        mover = np.full((k, k), -1)
+        for slot in np.flatnonzero(load):
+            members = np.flatnonzero(assignment == slot)
+            moves = delta[members]
+            best = moves.argmin(axis=0)
+            W[slot, :k] = moves[best, np.arange(k)]
+            mover[slot] = members[best]
+        np.fill_diagonal(W, np.inf)
+
+        W[:k, sink] = np.where(load < capacity, 0.0, overflow)
+        W[sink, :k] = np.where(load > capacity, -overflow, np.where(load > 0, 0.0, np.inf))
+
+        cycle = _find_negative_cycle(W, tolerance)
+        if cycle is None:
+            return assignment
+        for a, b in zip(cycle, cycle[1:]):
+            if a != sink and b != sink:
+                assignment[mover[a, b]] = b
+
+
+# Objective with total cost as tie-break, so plateaus of equal max latency
+# still move towards cheaper assignments
+def _score(costs, assignment, objective):
+    served = costs[np.arange(len(costs)), assignment]
+    return served.max() if objective == 'max' else served.mean(), served.sum()
+
+
+# Capacitated placement: local search over single-controller swaps, each
+# candidate re-assigned by min-cost flow warm-started from the current
+# assignment. Returns the placement, its latency under the capacitated
+# assignment and a node -> controller mapping.
+def place_controllers_capacitated(G, num_controllers, capacity, steps=500, trials=100, weight=None,
+                                  seed=None, objective='max', time_budget=None):
+    ig = index_graph(G, weight=weight)
+    D = distance_matrix(ig)
+    rng = np.random.default_rng(seed)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    # Start from the best uncapacitated placement among random samples
+    placements = random_placements(rng, ig.num_nodes, num_controllers, trials)
+    current = placements[np.argmin(score_placements(D, placements, objective))].copy()
+    costs = assignment_costs(D, current)
+    assignment = assign(costs, capacity)
+    current_score = _score(costs, assignment, objective)
+
+    for _ in range(steps):
+        slot = rng.integers(num_controllers)
+        node = rng.integers(ig.num_nodes)
+        if node in current:
+            continue
+        candidate = current.copy()
+        candidate[slot] = node
+        candidate_costs = assignment_costs(D, candidate)
+        candidate_assignment = assign(candidate_costs, capacity, assignment)
+        candidate_score = _score(candidate_costs, candidate_assignment, objective)
+        if candidate_score < current_score:
+            current, assignment, current_score = candidate, candidate_assignment, candidate_score
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+    served = D[np.arange(ig.num_nodes), current[assignment]]
+    latency = as_latency(reduce_nearest(served, objective), score_dtype(D, objective))
+    mapping = dict(zip(ig.labels, ig.to_labels(current[assignment])))
+    return ig.to_labels(current), latency, mapping
@@ -0,0 +1,62 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from graph_index import index_graph, subgraph
+from distance_matrix import gather_neighbors, to_csgraph
+from placement import allocate_controllers, place_controllers
+
+try:
+    from scipy.sparse.csgraph import connected_components as _scipy_components
+except ImportError:
+    _scipy_components = None
+
+
+# Component label of every node, numbered from 0
+def connected_components(ig):
+    if _scipy_components is not None:
+        return _scipy_components(to_csgraph(ig), directed=False)[1]
+
+    labels = np.full(ig.num_nodes, -1, dtype=np.int64)
+    count = 0
+    for root in range(ig.num_nodes):
+        if labels[root] >= 0:
+            continue
+        labels[root] = count
+        frontier = np.array([root])
+        while frontier.size:
+            nbrs = np.unique(gather_neighbors(ig.indptr, ig.indices, frontier))
+            frontier = nbrs[labels[nbrs] < 0]
+            labels[frontier] = count
+        count += 1
+    return labels
+
+
+def _solve_component(args):
+    component_graph, num_controllers, trials, seed = args
+    if num_controllers >= component_graph.num_nodes:
+        return list(component_graph.labels), 0
+    return place_controllers(component_graph, num_controllers, trials=trials, seed=seed)
+
+
+# Placement for disconnected topologies: every component gets at least one
+# controller, the rest go out in proportion to component size, and each
+# component is searched on its own so no evaluation is spent on inf latencies
+def place_controllers_by_component(G, num_controllers, trials=1000, weight=None, seed=None, workers=None):
+    ig = index_graph(G, weight=weight)
+    labels = connected_components(ig)
+    sizes = np.bincount(labels)
+    counts = allocate_controllers(sizes, num_controllers, limit=sizes)
+
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    order = np.argsort(labels, kind='stable')
+    members = np.split(order, np.cumsum(sizes)[:-1])
+    jobs = [(subgraph(ig, ids), int(k), trials, s) for ids, k, s in zip(members, counts, seeds)]
+    if workers == 1 or len(jobs) == 1:
+        solutions = list(map(_solve_component, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solutions = list(executor.map(_solve_component, jobs))
+
+    controllers = [label for placement, _ in solutions for label in placement]
+    return controllers, max(latency for _, latency in solutions)
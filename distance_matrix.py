@@ -0,0 +1,194 @@
+import heapq
+import numpy as np
+
+import kernels
+
+try:
+    from scipy.sparse import csr_matrix
+    from scipy.sparse.csgraph import dijkstra, shortest_path
+except ImportError:
+    csr_matrix = None
+
+# Rows of the APSP computed per scipy call, bounds the float64 scratch block
+BLOCK_ROWS = 256
+
+
+# Unreachable pairs hold the dtype's largest value (inf for float weights)
+def unreachable(dtype):
+    dtype = np.dtype(dtype)
+    if dtype.kind == 'f':
+        return dtype.type(np.inf)
+    return np.iinfo(dtype).max
+
+
+def hop_dtype(max_hops):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_hops < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.uint64)
+
+
+# Convert an evaluator result to a plain number, mapping the sentinel to inf
+def as_latency(value, dtype):
+    if value == unreachable(dtype):
+        return float('inf')
+    return value.item() if hasattr(value, 'item') else value
+
+
+def gather_edges(indptr, frontier):
+    # CSR offsets of every edge leaving frontier, with the frontier node of each
+    starts = indptr[frontier]
+    counts = indptr[frontier + 1] - starts
+    total = counts.sum()
+    offsets = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+    return np.repeat(frontier, counts), offsets
+
+
+def gather_neighbors(indptr, indices, frontier):
+    _, offsets = gather_edges(indptr, frontier)
+    return indices[offsets]
+
+
+def bfs_distances(ig, source, dtype=np.uint32):
+    dist = np.full(ig.num_nodes, unreachable(dtype), dtype=dtype)
+    dist[source] = 0
+    frontier = np.array([source], dtype=np.int32)
+    level = 0
+    while frontier.size:
+        level += 1
+        nbrs = gather_neighbors(ig.indptr, ig.indices, frontier)
+        nbrs = np.unique(nbrs[dist[nbrs] == unreachable(dtype)])
+        dist[nbrs] = level
+        frontier = nbrs
+    return dist
+
+
+def dijkstra_distances(ig, source, dtype=np.float32):
+    dist = np.full(ig.num_nodes, np.inf)
+    dist[source] = 0
+    heap = [(0.0, source)]
+    indptr, indices, weights = ig.indptr, ig.indices, ig.weights
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            nd = d + weights[j]
+            if nd < dist[v]:
+                dist[v] = nd
+                heapq.heappush(heap, (nd, v))
+    return dist.astype(dtype)
+
+
+# Diameter bound: twice the eccentricity of one root per connected component
+def hop_bound(ig):
+    seen = np.zeros(ig.num_nodes, dtype=bool)
+    bound = 0
+    for root in range(ig.num_nodes):
+        if seen[root]:
+            continue
+        dist = bfs_distances(ig, root)
+        reached = dist != unreachable(dist.dtype)
+        seen |= reached
+        bound = max(bound, 2 * int(dist[reached].max()))
+    return min(bound, max(ig.num_nodes - 1, 0))
+
+
+def to_csgraph(ig):
+    data = ig.weights if ig.weights is not None else np.ones(len(ig.indices))
+    return csr_matrix((data, ig.indices, ig.indptr), shape=(ig.num_nodes, ig.num_nodes))
+
+
+# Distance from every node to its nearest source, and the index (into sources)
+# of that source; -1 where no source is reachable. One O(E) search, no APSP.
+def nearest_source_distances(ig, sources):
+    sources = np.asarray(sources, dtype=np.int32)
+    if kernels.USE_NUMBA:
+        if ig.weights is None:
+            return kernels.multi_source_bfs(ig.indptr, ig.indices, sources)
+        return kernels.multi_source_dijkstra(ig.indptr, ig.indices, ig.weights, sources)
+
+    n = ig.num_nodes
+    dist = np.full(n, np.inf)
+    owner = np.full(n, -1, dtype=np.int32)
+
+    if ig.weights is None:
+        dist[sources] = 0
+        owner[sources] = np.arange(len(sources))
+        frontier = np.unique(sources)
+        level = 0
+        while frontier.size:
+            level += 1
+            parents, offsets = gather_edges(ig.indptr, frontier)
+            nbrs = ig.indices[offsets]
+            fresh = np.isinf(dist[nbrs])
+            nbrs, first = np.unique(nbrs[fresh], return_index=True)
+            dist[nbrs] = level
+            owner[nbrs] = owner[parents[fresh][first]]
+            frontier = nbrs
+        return dist, owner
+
+    if csr_matrix is not None:
+        dist, _, nearest = dijkstra(to_csgraph(ig), directed=False, indices=sources,
+                                    min_only=True, return_predecessors=True)
+        position = {source: i for i, source in enumerate(sources.tolist())}
+        reached = nearest >= 0
+        owner[reached] = [position[source] for source in nearest[reached]]
+        return dist, owner
+
+    heap = []
+    for i, source in enumerate(sources.tolist()):
+        if dist[source] > 0:
+            dist[source] = 0
+            owner[source] = i
+            heap.append((0.0, source))
+    heapq.heapify(heap)
+    indptr, indices, weights = ig.indptr, ig.indices, ig.weights
+    while heap:
+        d, u = heapq.heappop(heap)
+        if d > dist[u]:
+            continue
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            nd = d + weights[j]
+            if nd < dist[v]:
+                dist[v] = nd
+                owner[v] = owner[u]
+                heapq.heappush(heap, (nd, v))
+    return dist, owner
+
+
+def matrix_dtype(ig):
+    if ig.weights is not None:
+        return np.dtype(np.float32)
+    return hop_dtype(hop_bound(ig))
+
+
+# Dense all-pairs matrix indexed by node id, in the narrowest safe dtype:
+# uint8/uint16/uint32 hop counts, or float32 for `latency`-style weights
+def distance_matrix(ig):
+    n = ig.num_nodes
+    dtype = matrix_dtype(ig)
+    D = np.empty((n, n), dtype=dtype)
+
+    if csr_matrix is not None:
+        graph = to_csgraph(ig)
+        for start in range(0, n, BLOCK_ROWS):
+            rows = np.arange(start, min(start + BLOCK_ROWS, n))
+            block = shortest_path(graph, directed=False, unweighted=ig.weights is None, indices=rows)
+            block[np.isinf(block)] = unreachable(dtype)
+            D[rows] = block
+        return D
+
+    if kernels.USE_NUMBA:
+        for source in range(n):
+            row, _ = nearest_source_distances(ig, [source])
+            row[np.isinf(row)] = unreachable(dtype)
+            D[source] = row
+        return D
+
+    single_source = bfs_distances if ig.weights is None else dijkstra_distances
+    for source in range(n):
+        D[source] = single_source(ig, source, dtype)
+    return D
@@ -0,0 +1,130 @@
+import asyncio
+import time
+
+import numpy as np
+
+from graph_index import index_graph
+from flow_simulation import controller_paths
+
+HOST = '127.0.0.1'
+
+
+# Local stand-in controller: answers each newline-framed flow-setup request
+# "<id>" with "<id>" after service_time ms. Requests on one connection are
+# served concurrently so a shared connection does not serialise switches.
+async def _serve(reader, writer, service_time):
+    async def reply(message):
+        await asyncio.sleep(service_time / 1000.0)
+        writer.write(message)
+
+    pending = set()
+    while True:
+        message = await reader.readline()
+        if not message:
+            break
+        task = asyncio.ensure_future(reply(message))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+    writer.close()
+
+
+# Client side of one controller: a few TCP connections shared by all the
+# switches it serves, with replies matched to requests by id
+class ControllerChannel:
+    def __init__(self, connections):
+        self.connections = connections
+        self.futures = {}
+        self.next_id = 0
+        self.readers = [asyncio.ensure_future(self._read(reader)) for reader, _ in connections]
+
+    @classmethod
+    async def open(cls, port, num_connections):
+        connections = [await asyncio.open_connection(HOST, port) for _ in range(num_connections)]
+        return cls(connections)
+
+    async def _read(self, reader):
+        while True:
+            message = await reader.readline()
+            if not message:
+                break
+            self.futures.pop(int(message)).set_result(None)
+
+    async def request(self):
+        request_id = self.next_id
+        self.next_id += 1
+        future = asyncio.get_running_loop().create_future()
+        self.futures[request_id] = future
+        _, writer = self.connections[request_id % len(self.connections)]
+        writer.write(b'%d\n' % request_id)
+        await future
+
+    async def close(self):
+        for _, writer in self.connections:
+            writer.close()
+        await asyncio.gather(*self.readers)
+
+
+# One emulated switch: num_requests flow setups separated by exponential
+# think times, the link latency injected as a sleep in each direction
+async def _switch(channel, delay, num_requests, think_time, rng, samples):
+    for _ in range(num_requests):
+        await asyncio.sleep(rng.exponential(think_time) / 1000.0)
+        start = time.perf_counter()
+        await asyncio.sleep(delay / 1000.0)
+        await channel.request()
+        await asyncio.sleep(delay / 1000.0)
+        samples.append((time.perf_counter() - start) * 1000.0)
+
+
+async def _emulate(dist, owner, num_controllers, switches, num_requests, think_time, service_time,
+                   connections_per_controller, rng):
+    servers = [await asyncio.start_server(lambda r, w: _serve(r, w, service_time), HOST, 0)
+               for _ in range(num_controllers)]
+    ports = [server.sockets[0].getsockname()[1] for server in servers]
+    channels = [await ControllerChannel.open(port, connections_per_controller) for port in ports]
+
+    samples = [[] for _ in range(num_controllers)]
+    await asyncio.gather(*(_switch(channels[owner[s]], dist[s], num_requests, think_time, rng,
+                                   samples[owner[s]]) for s in switches))
+
+    for channel in channels:
+        await channel.close()
+    for server in servers:
+        server.close()
+        await server.wait_closed()
+    return samples
+
+
+# End-to-end emulation on localhost: every controller from place_controllers
+# runs as an asyncio server and every switch as a client coroutine in the
+# same event loop. Link latencies (ms, or hop_latency ms per hop) are
+# injected as delays. Returns a response-time histogram (ms) overall and
+# per controller, plus percentiles.
+def emulate_placement(G, controllers, num_requests=10, think_time=100.0, service_time=1.0,
+                      weight=None, hop_latency=1.0, switches=None, connections_per_controller=4,
+                      bins=50, seed=None):
+    ig = index_graph(G, weight=weight)
+    controller_ids = ig.ids(controllers)
+    dist, owner = controller_paths(ig, controller_ids)
+    if ig.weights is None:
+        dist = dist * hop_latency
+    switches = ig.switches() if switches is None else ig.ids(switches)
+    switches = switches[owner[switches] >= 0]
+    if not switches.size:
+        raise ValueError("No switch can reach a controller")
+
+    samples = asyncio.run(_emulate(dist.tolist(), owner.tolist(), len(controller_ids), switches.tolist(),
+                                   num_requests, think_time, service_time, connections_per_controller,
+                                   np.random.default_rng(seed)))
+
+    response = np.concatenate([np.array(s) for s in samples])
+    counts, edges = np.histogram(response, bins=bins)
+    return {
+        'requests': int(response.size),
+        'histogram': (counts, edges),
+        'per_controller': {label: np.histogram(s, bins=edges)[0]
+                           for label, s in zip(ig.to_labels(controller_ids), samples)},
+        'percentiles': {p: float(np.percentile(response, p)) for p in (50, 90, 99)},
+    }
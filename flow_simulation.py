@@ -0,0 +1,124 @@
+import heapq
+import time
+from collections import deque
+
+import numpy as np
+
+from graph_index import index_graph
+from distance_matrix import nearest_source_distances
+
+# Event kinds; a request reaches its controller before its service completes
+REQUEST = 0
+DONE = 1
+
+PERCENTILES = (50, 90, 99, 99.9)
+
+
+# One-way path latency from every node to its controller, and that
+# controller's index. Nodes use the nearest controller unless an explicit
+# node -> controller assignment (e.g. from place_controllers_capacitated) is given.
+def controller_paths(ig, controller_ids, assignment=None):
+    if assignment is None:
+        return nearest_source_distances(ig, controller_ids)
+    slot_of = {label: i for i, label in enumerate(ig.to_labels(controller_ids))}
+    owner = np.array([slot_of[assignment[label]] for label in ig.labels], dtype=np.int32)
+    dist = np.empty(ig.num_nodes)
+    for slot, controller in enumerate(controller_ids):
+        from_controller, _ = nearest_source_distances(ig, [controller])
+        dist[owner == slot] = from_controller[owner == slot]
+    return dist, owner
+
+
+# Heap-scheduled discrete-event simulation of flow-setup requests. Hosts
+# issue Poisson requests (arrival_rate per second, scalar or per source),
+# each travels its precomputed path latency to its controller, waits in
+# that controller's FIFO queue, is served, and the reply travels back.
+# Times are in ms; hop-count graphs use hop_latency ms per hop.
+def simulate_flow_setup(G, controllers, arrival_rate=10.0, service_time=1.0, duration=60000.0,
+                        warmup=0.0, weight=None, hop_latency=1.0, sources=None,
+                        service='exponential', assignment=None, seed=None):
+    ig = index_graph(G, weight=weight)
+    rng = np.random.default_rng(seed)
+    controller_ids = ig.ids(controllers)
+
+    dist, owner = controller_paths(ig, controller_ids, assignment)
+    if ig.weights is None:
+        dist = dist * hop_latency
+    if sources is None:
+        sources = ig.hosts() if len(ig.hosts()) else np.arange(ig.num_nodes)
+    else:
+        sources = ig.ids(sources)
+    rates = np.broadcast_to(np.asarray(arrival_rate, dtype=np.float64), sources.shape) / 1000.0
+    reachable = owner[sources] >= 0
+    unreachable_sources = int((~reachable).sum())
+    sources, rates = sources[reachable], rates[reachable]
+    if not rates.sum() > 0:
+        raise ValueError("No source with a positive rate can reach a controller")
+
+    # A superposition of Poisson processes: Poisson count, uniform times,
+    # source drawn in proportion to its rate
+    total_rate = rates.sum()
+    num_requests = rng.poisson(total_rate * duration)
+    created = np.sort(rng.uniform(0.0, duration, num_requests))
+    origin = sources[rng.choice(len(sources), num_requests, p=rates / total_rate)]
+    if service == 'exponential':
+        service_times = rng.exponential(service_time, num_requests)
+    elif service == 'deterministic':
+        service_times = np.full(num_requests, float(service_time))
+    else:
+        raise ValueError(f"Unknown service distribution: {service}")
+
+    path = dist[origin].tolist()
+    target = owner[origin].tolist()
+    service_times = service_times.tolist()
+    arrive = (created + dist[origin]).tolist()
+    events = list(zip(arrive, range(num_requests), [REQUEST] * num_requests))
+    heapq.heapify(events)
+
+    num_controllers = len(controller_ids)
+    busy = [False] * num_controllers
+    busy_time = [0.0] * num_controllers
+    max_queue = [0] * num_controllers
+    queues = [deque() for _ in range(num_controllers)]
+    finished = [0.0] * num_requests
+    heappop, heappush = heapq.heappop, heapq.heappush
+
+    start = time.perf_counter()
+    processed = 0
+    while events:
+        t, r, kind = heappop(events)
+        processed += 1
+        c = target[r]
+        if kind == REQUEST:
+            if busy[c]:
+                queue = queues[c]
+                queue.append(r)
+                if len(queue) > max_queue[c]:
+                    max_queue[c] = len(queue)
+            else:
+                busy[c] = True
+                heappush(events, (t + service_times[r], r, DONE))
+        else:
+            finished[r] = t + path[r]
+            busy_time[c] += service_times[r]
+            queue = queues[c]
+            if queue:
+                nxt = queue.popleft()
+                heappush(events, (t + service_times[nxt], nxt, DONE))
+            else:
+                busy[c] = False
+    elapsed = time.perf_counter() - start
+
+    response = (np.array(finished) - created)[created >= warmup]
+    end = max(finished) if num_requests else duration
+    return {
+        'requests': int(response.size),
+        'unreachable_sources': unreachable_sources,
+        'mean': float(response.mean()) if response.size else float('nan'),
+        'percentiles': {p: float(np.percentile(response, p)) if response.size else float('nan')
+                        for p in PERCENTILES},
+        'utilization': dict(zip(ig.to_labels(controller_ids), (np.array(busy_time) / end).tolist())),
+        'max_queue': dict(zip(ig.to_labels(controller_ids), max_queue)),
+        'events': processed,
+        'events_per_second': processed / elapsed if elapsed > 0 else float('inf'),
+    }
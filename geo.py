@@ -0,0 +1,17 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0
+
+# Light in fibre covers roughly 200 km per millisecond (about 2/3 of c)
+FIBER_KM_PER_MS = 200.0
+
+
+# Haversine distance; accepts scalars or arrays of degrees
+def great_circle_km(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(x, dtype=np.float64)) for x in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def propagation_delay_ms(lat1, lon1, lat2, lon2):
+    return great_circle_km(lat1, lon1, lat2, lon2) / FIBER_KM_PER_MS
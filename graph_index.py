@@ -0,0 +1,104 @@
+import numpy as np
+
+# Node type bitmask
+SWITCH = 1
+HOST = 2
+
+
+# Hosts come from the explicit hosts argument or a type='host' node
+# attribute; every other node is a switch
+def _node_type(node, attr, hosts):
+    if hosts is not None:
+        return HOST if node in hosts else SWITCH
+    node_type = attr.get('type')
+    if node_type == 'host':
+        return HOST
+    return SWITCH
+
+
+# Graph relabelled once to contiguous int32 ids, stored as CSR arrays.
+# Numeric code works on ids only; labels are looked up at the output boundary.
+class IndexedGraph:
+    def __init__(self, labels, node_type, indptr, indices, weights=None):
+        self.labels = labels
+        self.node_type = node_type
+        self.indptr = indptr
+        self.indices = indices
+        self.weights = weights
+        self.index = {label: i for i, label in enumerate(labels)}
+
+    @property
+    def num_nodes(self):
+        return len(self.labels)
+
+    @property
+    def num_edges(self):
+        return len(self.indices) // 2
+
+    def ids(self, labels):
+        return np.array([self.index[label] for label in labels], dtype=np.int32)
+
+    def to_labels(self, ids):
+        return [self.labels[i] for i in ids]
+
+    def neighbors(self, i):
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def switches(self):
+        return np.flatnonzero(self.node_type & SWITCH).astype(np.int32)
+
+    def hosts(self):
+        return np.flatnonzero(self.node_type & HOST).astype(np.int32)
+
+
+def from_edges(labels, node_type, src, dst, weights=None):
+    n = len(labels)
+    src = np.asarray(src, dtype=np.int32)
+    dst = np.asarray(dst, dtype=np.int32)
+
+    # Store each undirected edge in both directions, grouped by source
+    rows = np.concatenate([src, dst])
+    cols = np.concatenate([dst, src])
+    order = np.argsort(rows, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    indices = cols[order]
+
+    if weights is not None:
+        weights = np.concatenate([weights, weights])[order]
+    return IndexedGraph(labels, node_type, indptr, indices, weights)
+
+
+def index_graph(G, weight=None, hosts=None):
+    if isinstance(G, IndexedGraph):
+        return G
+
+    labels = np.empty(G.number_of_nodes(), dtype=object)
+    labels[:] = list(G.nodes)
+    if hosts is not None:
+        hosts = set(hosts)
+    node_type = np.array([_node_type(node, attr, hosts) for node, attr in G.nodes(data=True)],
+                         dtype=np.uint8)
+
+    index = {label: i for i, label in enumerate(labels)}
+    edges = G.edges(data=True)
+    src = np.fromiter((index[u] for u, _, _ in edges), dtype=np.int32, count=len(edges))
+    dst = np.fromiter((index[v] for _, v, _ in edges), dtype=np.int32, count=len(edges))
+    weights = None
+    if weight is not None:
+        weights = np.fromiter((attr.get(weight, 1.0) for _, _, attr in edges),
+                              dtype=np.float64, count=len(edges))
+    return from_edges(labels, node_type, src, dst, weights)
+
+
+# Induced subgraph on the given ids; node i of the result is ids[i]
+def subgraph(ig, ids):
+    ids = np.asarray(ids, dtype=np.int32)
+    local = np.full(ig.num_nodes, -1, dtype=np.int32)
+    local[ids] = np.arange(len(ids), dtype=np.int32)
+
+    src = np.repeat(np.arange(ig.num_nodes, dtype=np.int32), np.diff(ig.indptr))
+    dst = ig.indices
+    keep = (local[src] >= 0) & (local[dst] >= 0) & (src < dst)
+    weights = ig.weights[keep] if ig.weights is not None else None
+    return from_edges(ig.labels[ids], ig.node_type[ids], local[src[keep]], local[dst[keep]], weights)
@@ -0,0 +1,196 @@
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from graph_index import index_graph, subgraph
+from distance_matrix import gather_neighbors, nearest_source_distances
+from placement import allocate_controllers, place_controllers
+
+try:
+    from scipy.sparse.linalg import eigsh
+except ImportError:
+    eigsh = None
+
+# Regions up to this size use a dense eigensolver for the Fiedler vector
+DENSE_SPECTRAL_LIMIT = 1000
+
+
+def label_propagation(ig, rng, max_iter=20):
+    labels = np.arange(ig.num_nodes)
+    for _ in range(max_iter):
+        changed = False
+        for u in rng.permutation(ig.num_nodes):
+            nbrs = ig.neighbors(u)
+            if not nbrs.size:
+                continue
+            counts = Counter(labels[nbrs].tolist())
+            best = max(counts.values())
+            if counts.get(labels[u], 0) == best:
+                continue
+            labels[u] = rng.choice([label for label, count in counts.items() if count == best])
+            changed = True
+        if not changed:
+            break
+    return np.unique(labels, return_inverse=True)[1]
+
+
+def fiedler_split(ig, ids):
+    if len(ids) < 4:
+        return ids[:len(ids) // 2], ids[len(ids) // 2:]
+    sub = subgraph(ig, ids)
+    n = sub.num_nodes
+    degree = np.diff(sub.indptr)
+    rows = np.repeat(np.arange(n), degree)
+
+    if n <= DENSE_SPECTRAL_LIMIT or eigsh is None:
+        L = np.diag(degree.astype(np.float64))
+        np.subtract.at(L, (rows, sub.indices), 1.0)
+        vectors = np.linalg.eigh(L)[1]
+    else:
+        from scipy.sparse import csr_matrix, diags
+        A = csr_matrix((np.ones(len(sub.indices)), sub.indices, sub.indptr), shape=(n, n))
+        vectors = eigsh(diags(degree.astype(np.float64)) - A, k=2, which='SA')[1]
+
+    order = np.argsort(vectors[:, 1], kind='stable')
+    return ids[order[:n // 2]], ids[order[n // 2:]]
+
+
+# Recursive spectral bisection: always split the largest region
+def spectral_partition(ig, num_regions):
+    regions = [np.arange(ig.num_nodes)]
+    while len(regions) < num_regions:
+        largest = max(range(len(regions)), key=lambda r: len(regions[r]))
+        if len(regions[largest]) < 2:
+            break
+        regions.extend(fiedler_split(ig, regions.pop(largest)))
+    labels = np.empty(ig.num_nodes, dtype=np.int64)
+    for r, ids in enumerate(regions):
+        labels[ids] = r
+    return labels
+
+
+# Merge the smallest region into the neighbour it shares most edges with,
+# or split the largest by BFS order, until there are exactly num_regions
+def balance_regions(ig, labels, num_regions):
+    while labels.max() + 1 > num_regions:
+        smallest = np.argmin(np.bincount(labels))
+        members = np.flatnonzero(labels == smallest)
+        nbrs = gather_neighbors(ig.indptr, ig.indices, members)
+        nbrs = labels[nbrs][labels[nbrs] != smallest]
+        target = np.bincount(nbrs).argmax() if nbrs.size else (smallest + 1) % (labels.max() + 1)
+        labels[members] = target
+        labels = np.unique(labels, return_inverse=True)[1]
+
+    while labels.max() + 1 < num_regions:
+        sizes = np.bincount(labels)
+        largest = np.argmax(sizes)
+        if sizes[largest] < 2:
+            break
+        members = np.flatnonzero(labels == largest)
+        order = bfs_order(subgraph(ig, members))
+        labels[members[order[len(order) // 2:]]] = labels.max() + 1
+    return labels
+
+
+def bfs_order(ig):
+    seen = np.zeros(ig.num_nodes, dtype=bool)
+    order = []
+    for root in range(ig.num_nodes):
+        if seen[root]:
+            continue
+        seen[root] = True
+        frontier = np.array([root])
+        while frontier.size:
+            order.extend(frontier.tolist())
+            nbrs = np.unique(gather_neighbors(ig.indptr, ig.indices, frontier))
+            frontier = nbrs[~seen[nbrs]]
+            seen[frontier] = True
+    return np.array(order, dtype=np.int64)
+
+
+# Region of every node: partition the switch graph, then attach each host
+# to the region of its nearest switch
+def partition_regions(ig, num_regions, method='label_propagation', seed=None):
+    switches = ig.switches()
+    switch_graph = subgraph(ig, switches)
+    if method == 'label_propagation':
+        switch_labels = label_propagation(switch_graph, np.random.default_rng(seed))
+    elif method == 'spectral':
+        switch_labels = spectral_partition(switch_graph, num_regions)
+    else:
+        raise ValueError(f"Unknown partitioning method: {method}")
+    switch_labels = balance_regions(switch_graph, switch_labels, num_regions)
+
+    _, owner = nearest_source_distances(ig, switches)
+    regions = np.zeros(ig.num_nodes, dtype=np.int64)
+    reached = owner >= 0
+    regions[reached] = switch_labels[owner[reached]]
+    return regions
+
+
+def _solve_region(args):
+    region_graph, num_controllers, trials, seed = args
+    return place_controllers(region_graph, num_controllers, trials=trials, seed=seed)
+
+
+# Move the controller serving the worst node along a shortest path towards it
+# while that lowers the global max latency
+def refine(ig, controllers, iterations, candidates_per_step=8):
+    dist, owner = nearest_source_distances(ig, controllers)
+    for _ in range(iterations):
+        worst = np.argmax(dist)
+        serving = owner[worst]
+        if serving < 0:
+            break
+        from_controller, _ = nearest_source_distances(ig, controllers[serving:serving + 1])
+        from_worst, _ = nearest_source_distances(ig, [worst])
+        on_path = np.flatnonzero(np.isclose(from_controller + from_worst, from_controller[worst]))
+        midpoint = from_controller[worst] / 2
+        on_path = on_path[np.argsort(np.abs(from_controller[on_path] - midpoint), kind='stable')]
+
+        best = None
+        for node in on_path[:candidates_per_step]:
+            trial = controllers.copy()
+            trial[serving] = node
+            trial_dist, trial_owner = nearest_source_distances(ig, trial)
+            if trial_dist.max() < (dist if best is None else best[1]).max():
+                best = trial, trial_dist, trial_owner
+        if best is None:
+            break
+        controllers, dist, owner = best
+    return controllers, dist
+
+
+def _latency(ig, value):
+    return int(value) if ig.weights is None and np.isfinite(value) else float(value)
+
+
+# Hierarchical placement for graphs too large for one global search:
+# partition into regions, solve each region in parallel, then refine globally.
+# Returns the placement, its max latency and the max latency within each region.
+def place_controllers_hierarchical(G, num_controllers, num_regions=None, method='label_propagation',
+                                   trials=1000, refine_iters=50, weight=None, seed=None, workers=None):
+    ig = index_graph(G, weight=weight)
+    num_regions = min(num_regions or num_controllers, num_controllers, len(ig.switches()))
+    regions = partition_regions(ig, num_regions, method=method, seed=seed)
+    members = [np.flatnonzero(regions == r) for r in range(regions.max() + 1)]
+    counts = allocate_controllers([len(ids) for ids in members], num_controllers,
+                                  limit=[len(ids) for ids in members])
+
+    seeds = np.random.SeedSequence(seed).spawn(len(members))
+    jobs = [(subgraph(ig, ids), int(k), trials, s) for ids, k, s in zip(members, counts, seeds)]
+    if workers == 1:
+        solutions = list(map(_solve_region, jobs))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            solutions = list(executor.map(_solve_region, jobs))
+
+    controllers = np.concatenate([ig.ids(placement) for placement, _ in solutions])
+    controllers, dist = refine(ig, controllers, refine_iters)
+
+    # Each region's max latency under the final placement
+    regional = np.zeros(len(members))
+    np.maximum.at(regional, regions, dist)
+    regional_latencies = [_latency(ig, latency) for latency in regional]
+    return ig.to_labels(controllers), _latency(ig, dist.max()), regional_latencies
@@ -0,0 +1,392 @@
+import os
+
+import numpy as np
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+# Compiled kernels are optional: callers check USE_NUMBA and otherwise keep
+# their NumPy/SciPy code paths. Set CONTROLLER_PLACEMENT_NO_NUMBA=1 to force
+# the fallback (the benchmark flips USE_NUMBA to compare both). Kernels are
+# serial and release the GIL: callers parallelise across threads (as the
+# placement service does), which numba's default workqueue threading layer
+# does not allow for parallel=True kernels.
+HAVE_NUMBA = numba is not None
+USE_NUMBA = HAVE_NUMBA and not os.environ.get('CONTROLLER_PLACEMENT_NO_NUMBA')
+
+
+def _jit():
+    if numba is None:
+        return lambda function: function
+    return numba.njit(cache=True, nogil=True)
+
+
+# Nearest-source hop distance (float64, inf if unreachable) and the index of
+# that source, by one FIFO BFS over the CSR arrays
+@_jit()
+def multi_source_bfs(indptr, indices, sources):
+    n = len(indptr) - 1
+    dist = np.full(n, np.inf)
+    owner = np.full(n, -1, dtype=np.int32)
+    queue = np.empty(n, dtype=np.int64)
+    head = 0
+    tail = 0
+    for i in range(len(sources)):
+        s = sources[i]
+        if dist[s] != 0:
+            dist[s] = 0
+            owner[s] = i
+            queue[tail] = s
+            tail += 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            if dist[v] == np.inf:
+                dist[v] = dist[u] + 1
+                owner[v] = owner[u]
+                queue[tail] = v
+                tail += 1
+    return dist, owner
+
+
+@_jit()
+def _heap_push(keys, nodes, size, key, node):
+    i = size
+    keys[i] = key
+    nodes[i] = node
+    while i > 0:
+        parent = (i - 1) // 2
+        if keys[parent] <= keys[i]:
+            break
+        keys[parent], keys[i] = keys[i], keys[parent]
+        nodes[parent], nodes[i] = nodes[i], nodes[parent]
+        i = parent
+    return size + 1
+
+
+@_jit()
+def _heap_pop(keys, nodes, size):
+    key = keys[0]
+    node = nodes[0]
+    size -= 1
+    keys[0] = keys[size]
+    nodes[0] = nodes[size]
+    i = 0
+    while True:
+        left = 2 * i + 1
+        smallest = i
+        if left < size and keys[left] < keys[smallest]:
+            smallest = left
+        if left + 1 < size and keys[left + 1] < keys[smallest]:
+            smallest = left + 1
+        if smallest == i:
+            break
+        keys[smallest], keys[i] = keys[i], keys[smallest]
+        nodes[smallest], nodes[i] = nodes[i], nodes[smallest]
+        i = smallest
+    return key, node, size
+
+
+# Nearest-source Dijkstra on edge weights with a lazy-deletion binary heap
+@_jit()
+def multi_source_dijkstra(indptr, indices, weights, sources):
+    n = len(indptr) - 1
+    dist = np.full(n, np.inf)
+    owner = np.full(n, -1, dtype=np.int32)
+    capacity = len(indices) + len(sources) + 1
+    keys = np.empty(capacity)
+    nodes = np.empty(capacity, dtype=np.int64)
+    size = 0
+    for i in range(len(sources)):
+        s = sources[i]
+        if dist[s] != 0:
+            dist[s] = 0
+            owner[s] = i
+            size = _heap_push(keys, nodes, size, 0.0, s)
+    while size > 0:
+        d, u, size = _heap_pop(keys, nodes, size)
+        if d > dist[u]:
+            continue
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            nd = d + weights[j]
+            if nd < dist[v]:
+                dist[v] = nd
+                owner[v] = owner[u]
+                size = _heap_push(keys, nodes, size, nd, v)
+    return dist, owner
+
+
+# BFS from source stopping at `radius` hops. Reached nodes are left in
+# queue[:count] in BFS order with their hop count in level; the caller
+# resets level to -1 for them before the next source.
+@_jit()
+def _ball(indptr, indices, source, radius, level, queue):
+    level[source] = 0
+    queue[0] = source
+    head = 0
+    tail = 1
+    while head < tail:
+        u = queue[head]
+        head += 1
+        if level[u] >= radius:
+            continue
+        for j in range(indptr[u], indptr[u + 1]):
+            v = indices[j]
+            if level[v] < 0:
+                level[v] = level[u] + 1
+                queue[tail] = v
+                tail += 1
+    return tail
+
+
+# Number of nodes within `radius` hops of every source
+@_jit()
+def ball_sizes(indptr, indices, sources, radius):
+    n = len(indptr) - 1
+    level = np.full(n, -1, dtype=np.int32)
+    queue = np.empty(n, dtype=np.int64)
+    sizes = np.empty(len(sources), dtype=np.int64)
+    for i in range(len(sources)):
+        count = _ball(indptr, indices, sources[i], radius, level, queue)
+        sizes[i] = count
+        for q in range(count):
+            level[queue[q]] = -1
+    return sizes
+
+
+# Fill the balls of every source into preallocated CSR-style arrays:
+# source i's nodes and hop counts go to offsets[i]:offsets[i + 1]
+@_jit()
+def fill_balls(indptr, indices, sources, radius, offsets, nodes, dist):
+    n = len(indptr) - 1
+    level = np.full(n, -1, dtype=np.int32)
+    queue = np.empty(n, dtype=np.int64)
+    for i in range(len(sources)):
+        count = _ball(indptr, indices, sources[i], radius, level, queue)
+        start = offsets[i]
+        for q in range(count):
+            v = queue[q]
+            nodes[start + q] = v
+            dist[start + q] = level[v]
+            level[v] = -1
+
+
+# Max over nodes of the min over each placement's controllers; keeps D's
+# dtype. D is candidate-major: row c holds the distances from candidate c
+# to every node, so each controller is one contiguous row.
+@_jit()
+def max_min_scores(D, placements):
+    num_placements, k = placements.shape
+    n = D.shape[1]
+    scores = np.empty(num_placements, dtype=D.dtype)
+    for p in range(num_placements):
+        nearest = D[placements[p, 0]].copy()
+        for c in range(1, k):
+            row = D[placements[p, c]]
+            for v in range(n):
+                if row[v] < nearest[v]:
+                    nearest[v] = row[v]
+        scores[p] = nearest.max()
+    return scores
+
+
+# Mean over nodes of the min over controllers; inf when any node is cut off
+@_jit()
+def mean_min_scores(D, placements, sentinel):
+    num_placements, k = placements.shape
+    n = D.shape[1]
+    scores = np.empty(num_placements)
+    for p in range(num_placements):
+        nearest = D[placements[p, 0]].copy()
+        for c in range(1, k):
+            row = D[placements[p, c]]
+            for v in range(n):
+                if row[v] < nearest[v]:
+                    nearest[v] = row[v]
+        total = 0.0
+        for v in range(n):
+            if nearest[v] == sentinel:
+                total = np.inf
+                break
+            total += nearest[v]
+        scores[p] = total / n
+    return scores
+
+
+# Dense (n, n) Dijkstra distances, one heap run per source, for a batch of
+# weight vectors over the same CSR structure: weights is (S, nnz), the
+# result (S, n, n) float32 with inf where unreachable
+@_jit()
+def batched_all_pairs_dijkstra(indptr, indices, weights):
+    num_scenarios = weights.shape[0]
+    n = len(indptr) - 1
+    out = np.full((num_scenarios, n, n), np.inf, dtype=np.float32)
+    keys = np.empty(len(indices) + 1)
+    nodes = np.empty(len(indices) + 1, dtype=np.int64)
+    dist = np.empty(n)
+    for s in range(num_scenarios):
+        for source in range(n):
+            dist[:] = np.inf
+            dist[source] = 0.0
+            size = _heap_push(keys, nodes, 0, 0.0, source)
+            while size > 0:
+                d, u, size = _heap_pop(keys, nodes, size)
+                if d > dist[u]:
+                    continue
+                for j in range(indptr[u], indptr[u + 1]):
+                    v = indices[j]
+                    nd = d + weights[s, j]
+                    if nd < dist[v]:
+                        dist[v] = nd
+                        size = _heap_push(keys, nodes, size, nd, v)
+            for v in range(n):
+                out[s, source, v] = dist[v]
+    return out
+
+
+# All-pairs distances of many small graphs stored as one block-diagonal CSR
+# (graph g owns nodes offsets[g]:offsets[g + 1]), written into a (G, N, N)
+# float32 stack: inf for unreachable pairs, 0 in the padding beyond each
+# graph's size. Hop counts by BFS, or Dijkstra when weighted is set.
+@_jit()
+def stacked_all_pairs(indptr, indices, weights, offsets, size, weighted):
+    num_graphs = len(offsets) - 1
+    out = np.zeros((num_graphs, size, size), dtype=np.float32)
+    total = offsets[-1]
+    dist = np.full(total, np.inf)
+    queue = np.empty(total, dtype=np.int64)
+    keys = np.empty(len(indices) + 1)
+    nodes = np.empty(len(indices) + 1, dtype=np.int64)
+    for g in range(num_graphs):
+        first, last = offsets[g], offsets[g + 1]
+        for source in range(first, last):
+            for v in range(first, last):
+                dist[v] = np.inf
+            dist[source] = 0.0
+            if weighted:
+                size_heap = _heap_push(keys, nodes, 0, 0.0, source)
+                while size_heap > 0:
+                    d, u, size_heap = _heap_pop(keys, nodes, size_heap)
+                    if d > dist[u]:
+                        continue
+                    for j in range(indptr[u], indptr[u + 1]):
+                        v = indices[j]
+                        nd = d + weights[j]
+                        if nd < dist[v]:
+                            dist[v] = nd
+                            size_heap = _heap_push(keys, nodes, size_heap, nd, v)
+            else:
+                head = 0
+                tail = 1
+                queue[0] = source
+                while head < tail:
+                    u = queue[head]
+                    head += 1
+                    for j in range(indptr[u], indptr[u + 1]):
+                        v = indices[j]
+                        if dist[v] == np.inf:
+                            dist[v] = dist[u] + 1
+                            queue[tail] = v
+                            tail += 1
+            for v in range(first, last):
+                out[g, source - first, v - first] = dist[v]
+    return out
+
+
+# Random placements for a stack of graphs by partial Fisher-Yates shuffles
+# driven by uniforms in [0, 1) of shape (G, P, K): graph g gets ks[g]
+# distinct nodes below sizes[g] in O(k) per placement, and unused slots
+# repeat the first controller
+@_jit()
+def sample_placements(uniforms, sizes, ks):
+    num_graphs, num_placements, k_max = uniforms.shape
+    placements = np.empty((num_graphs, num_placements, k_max), dtype=np.int32)
+    perm = np.arange(sizes.max())
+    for g in range(num_graphs):
+        n = sizes[g]
+        k = ks[g]
+        for p in range(num_placements):
+            for j in range(k):
+                r = min(j + int(uniforms[g, p, j] * (n - j)), n - 1)
+                perm[j], perm[r] = perm[r], perm[j]
+                placements[g, p, j] = perm[j]
+            for j in range(k, k_max):
+                placements[g, p, j] = placements[g, p, 0]
+            # Undo the swaps so perm is the identity again
+            for j in range(k - 1, -1, -1):
+                r = min(j + int(uniforms[g, p, j] * (n - j)), n - 1)
+                perm[j], perm[r] = perm[r], perm[j]
+    return placements
+
+
+# max_min_scores for every graph of a padded (G, N, N) stack at once, only
+# reading each graph's own sizes[g] nodes and ks[g] controllers
+@_jit()
+def stacked_max_min_scores(D, placements, sizes, ks):
+    num_graphs, num_placements, _ = placements.shape
+    scores = np.empty((num_graphs, num_placements), dtype=D.dtype)
+    nearest = np.empty(D.shape[1], dtype=D.dtype)
+    for g in range(num_graphs):
+        n = sizes[g]
+        for p in range(num_placements):
+            nearest[:n] = D[g, placements[g, p, 0], :n]
+            for c in range(1, ks[g]):
+                row = D[g, placements[g, p, c]]
+                for v in range(n):
+                    if row[v] < nearest[v]:
+                        nearest[v] = row[v]
+            scores[g, p] = nearest[:n].max()
+    return scores
+
+
+# Best of every graph's placements under max latency, without scoring all
+# of them in full: a placement stops as soon as one node is served no
+# better than the best placement so far (it cannot beat it), and a node's
+# controller scan stops once it cannot raise the running max. The best
+# placement's worst-served node is checked first, since it is the node
+# most likely to rule out the next one. Returns (G,) indices and scores;
+# ties keep the first placement, as argmin does.
+@_jit()
+def stacked_best_placements(D, placements, sizes, ks):
+    num_graphs, num_placements, _ = placements.shape
+    best = np.zeros(num_graphs, dtype=np.int64)
+    scores = np.empty(num_graphs, dtype=D.dtype)
+    for g in range(num_graphs):
+        n = sizes[g]
+        k = ks[g]
+        critical = 0
+        for p in range(num_placements):
+            worst = D[g, 0, 0]
+            worst_node = -1
+            pruned = False
+            for i in range(n + 1):
+                # Visit the critical node first, then every other node
+                if i == 0:
+                    v = critical
+                elif i - 1 == critical:
+                    continue
+                else:
+                    v = i - 1
+                nearest = D[g, placements[g, p, 0], v]
+                for c in range(1, k):
+                    if worst_node >= 0 and nearest <= worst:
+                        break
+                    d = D[g, placements[g, p, c], v]
+                    if d < nearest:
+                        nearest = d
+                if worst_node < 0 or nearest > worst:
+                    worst = nearest
+                    worst_node = v
+                    if p > 0 and worst >= scores[g]:
+                        pruned = True
+                        break
+            if not pruned:
+                best[g] = p
+                scores[g] = worst
+                critical = worst_node
+    return best, scores
@@ -0,0 +1,116 @@
+import numpy as np
+
+from graph_index import index_graph
+from distance_matrix import csr_matrix, nearest_source_distances, to_csgraph
+from placement import CHUNK_ELEMENTS, random_placements, score_placements
+from threshold import farthest_first
+
+try:
+    from scipy.sparse.csgraph import shortest_path
+except ImportError:
+    shortest_path = None
+
+# Placements with the best estimated scores that are checked exactly
+VERIFY_CANDIDATES = 16
+
+
+# (L, V) float32 distances from each landmark, inf where unreachable
+def landmark_distances(ig, landmarks):
+    if csr_matrix is not None:
+        dist = shortest_path(to_csgraph(ig), directed=False, unweighted=ig.weights is None, indices=landmarks)
+        return dist.astype(np.float32)
+    return np.array([nearest_source_distances(ig, [landmark])[0] for landmark in landmarks], dtype=np.float32)
+
+
+# Approximate distances from L single-source searches, O(L*V) memory. By the
+# triangle inequality, for every landmark l
+#     |d(l, u) - d(l, v)| <= d(u, v) <= d(l, u) + d(l, v)
+# so the tightest bounds over all landmarks bracket the true distance; both
+# are exact when u or v is itself a landmark.
+class LandmarkOracle:
+    def __init__(self, ig, landmarks):
+        self.landmarks = np.asarray(landmarks, dtype=np.int64)
+        self.dist = landmark_distances(ig, self.landmarks)
+
+    # Tightest bound over the landmarks, one landmark at a time so the
+    # scratch stays (len(nodes), len(targets))
+    def upper(self, nodes, targets):
+        a, b = self.dist[:, nodes], self.dist[:, targets]
+        bound = a[0][:, None] + b[0][None, :]
+        for l in range(1, len(self.landmarks)):
+            np.minimum(bound, a[l][:, None] + b[l][None, :], out=bound)
+        return bound
+
+    def lower(self, nodes, targets):
+        a, b = self.dist[:, nodes], self.dist[:, targets]
+        bound = np.zeros((a.shape[1], b.shape[1]), dtype=self.dist.dtype)
+        with np.errstate(invalid='ignore'):
+            for l in range(len(self.landmarks)):
+                gap = np.abs(a[l][:, None] - b[l][None, :])
+                # A landmark reaching neither node says nothing (inf - inf)
+                np.fmax(bound, gap, out=bound)
+        return bound
+
+    def bounds(self, nodes, targets):
+        return self.lower(nodes, targets), self.upper(nodes, targets)
+
+    # (V, len(targets)) upper-bound estimates to every node, built in chunks.
+    # Stored target-major (a transposed view) so each target's column is
+    # contiguous for the scoring kernels.
+    def columns(self, targets, num_nodes):
+        targets = np.asarray(targets)
+        estimate = np.empty((len(targets), num_nodes), dtype=np.float32)
+        nodes = np.arange(num_nodes)
+        step = max(1, CHUNK_ELEMENTS // num_nodes)
+        for start in range(0, len(targets), step):
+            estimate[start:start + step] = self.upper(targets[start:start + step], nodes)
+        return estimate.T
+
+
+def _exact_latency(ig, controllers):
+    dist, _ = nearest_source_distances(ig, controllers)
+    latency = dist.max()
+    return int(latency) if ig.weights is None and np.isfinite(latency) else float(latency)
+
+
+# Placement for graphs too large for an APSP matrix. Landmarks are picked
+# by farthest-first traversal; candidate controllers are the landmarks plus
+# a random sample of nodes, topped up to at least k. Random search scores
+# placements on the landmark upper bounds, then the best few are evaluated
+# exactly with one multi-source search each, skipping any whose lower-bound
+# score cannot beat the best exact latency so far. The returned latency is
+# exact.
+def place_controllers_landmarks(G, num_controllers, num_landmarks=16, num_candidates=256, trials=1000,
+                                verify=VERIFY_CANDIDATES, weight=None, seed=None):
+    ig = index_graph(G, weight=weight)
+    if num_controllers > ig.num_nodes:
+        raise ValueError("More controllers than nodes in the graph")
+    rng = np.random.default_rng(seed)
+    landmarks, _ = farthest_first(ig, min(num_landmarks, ig.num_nodes), rng)
+    oracle = LandmarkOracle(ig, landmarks)
+
+    sample = rng.choice(ig.num_nodes, min(num_candidates, ig.num_nodes), replace=False)
+    pool = np.unique(np.concatenate([oracle.landmarks, sample]))
+    if len(pool) < num_controllers:
+        # Top the pool up with random other nodes so it can hold k controllers
+        rest = np.setdiff1d(np.arange(ig.num_nodes), pool)
+        pool = np.union1d(pool, rng.choice(rest, num_controllers - len(pool), replace=False))
+    if num_controllers == len(pool):
+        return ig.to_labels(pool), _exact_latency(ig, pool)
+    estimate = oracle.columns(pool, ig.num_nodes)
+
+    placements = np.sort(random_placements(rng, len(pool), num_controllers, trials), axis=1)
+    placements = np.unique(placements, axis=0)
+    scores = score_placements(estimate, placements)
+    shortlist = placements[np.argsort(scores, kind='stable')[:verify]]
+
+    nodes = np.arange(ig.num_nodes)
+    best, best_latency = None, np.inf
+    for placement in shortlist:
+        controllers = pool[placement]
+        if best is not None and oracle.lower(nodes, controllers).min(axis=1).max() >= best_latency:
+            continue
+        latency = _exact_latency(ig, controllers)
+        if best is None or latency < best_latency:
+            best, best_latency = controllers, latency
+    return ig.to_labels(best), best_latency
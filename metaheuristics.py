@@ -0,0 +1,117 @@
+import time
+
+import numpy as np
+
+from distance_matrix import unreachable
+from placement import random_placements, reduce_nearest, score_placements
+
+
+def _deadline(time_budget):
+    return None if time_budget is None else time.perf_counter() + time_budget
+
+
+def _expired(deadline):
+    return deadline is not None and time.perf_counter() > deadline
+
+
+# For each controller slot, every node's latency to the nearest *other*
+# controller: the starting point for scoring a swap of that slot, shape (k, n)
+def nearest_without_slot(columns):
+    n, k = columns.shape
+    if k == 1:
+        return np.full((1, n), unreachable(columns.dtype), dtype=columns.dtype)
+    rows = np.arange(n)
+    pair = np.argpartition(columns, 1, axis=1)[:, :2]
+    first = columns[rows, pair[:, 0]]
+    second = columns[rows, pair[:, 1]]
+    return np.where(pair[:, 0] == np.arange(k)[:, None], second, first)
+
+
+# Simulated annealing over swap moves. Each step scores a whole batch of
+# (slot, node) swaps against the cached matrix and proposes the best one.
+def simulated_annealing(D, num_controllers, rng, objective='max', steps=2000, batch=64,
+                        temperature=None, cooling=0.995, time_budget=None):
+    deadline = _deadline(time_budget)
+    n = D.shape[0]
+    current = random_placements(rng, n, num_controllers, 1)[0]
+    columns = D[:, current]
+    without = nearest_without_slot(columns)
+    current_score = reduce_nearest(columns.min(axis=1), objective)
+    best, best_score = current.copy(), current_score
+
+    for _ in range(steps):
+        slots = rng.integers(num_controllers, size=batch)
+        nodes = rng.integers(n, size=batch)
+        scores = reduce_nearest(np.minimum(without[slots], D[:, nodes].T), objective, axis=1)
+        scores = scores.astype(np.float64)
+        scores[np.isin(nodes, current)] = np.inf
+
+        if temperature is None:
+            finite = scores[np.isfinite(scores)]
+            temperature = finite.std() if finite.size and finite.std() > 0 else 1.0
+
+        i = np.argmin(scores)
+        if scores[i] <= current_score or rng.random() < np.exp((float(current_score) - scores[i]) / temperature):
+            current[slots[i]] = nodes[i]
+            columns[:, slots[i]] = D[:, nodes[i]]
+            without = nearest_without_slot(columns)
+            current_score = scores[i]
+            if current_score < best_score:
+                best, best_score = current.copy(), current_score
+
+        temperature *= cooling
+        if _expired(deadline):
+            break
+
+    return best, reduce_nearest(D[:, best].min(axis=1), objective)
+
+
+# Child keeps the controllers both parents share and fills the rest from
+# the ones only a single parent has
+def set_crossover(rng, a, b):
+    shared = np.intersect1d(a, b)
+    rest = np.setxor1d(a, b)
+    return np.concatenate([shared, rng.choice(rest, len(a) - len(shared), replace=False)])
+
+
+def mutate(rng, children, num_nodes, rate):
+    if children.shape[1] >= num_nodes:
+        return
+    for i in np.flatnonzero(rng.random(len(children)) < rate):
+        node = rng.integers(num_nodes)
+        while node in children[i]:
+            node = rng.integers(num_nodes)
+        children[i, rng.integers(children.shape[1])] = node
+
+
+# Genetic algorithm with tournament selection, set crossover and elitism;
+# every generation is scored as one batch
+def genetic_algorithm(D, num_controllers, rng, objective='max', population=64, generations=200,
+                      mutation_rate=0.2, elite=2, tournament=3, time_budget=None):
+    deadline = _deadline(time_budget)
+    n = D.shape[0]
+    pop = random_placements(rng, n, num_controllers, population)
+    fitness = score_placements(D, pop, objective)
+
+    for _ in range(generations):
+        order = np.argsort(fitness, kind='stable')[:elite]
+        num_children = population - elite
+        contenders = rng.integers(population, size=(2 * num_children, tournament))
+        winners = contenders[np.arange(len(contenders)), np.argmin(fitness[contenders], axis=1)]
+        parents = pop[winners].reshape(num_children, 2, num_controllers)
+
+        children = np.array([set_crossover(rng, a, b) for a, b in parents], dtype=pop.dtype)
+        mutate(rng, children, n, mutation_rate)
+        pop = np.concatenate([pop[order], children])
+        fitness = np.concatenate([fitness[order], score_placements(D, children, objective)])
+        if _expired(deadline):
+            break
+
+    best = np.argmin(fitness)
+    return pop[best], fitness[best]
+
+
+STRATEGIES = {
+    'annealing': simulated_annealing,
+    'genetic': genetic_algorithm,
+}
@@ -0,0 +1,118 @@
+import math
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from placement import place_controllers
+from topologies import TOPOLOGY_TYPES, generate_topology
+
+try:
+    from scipy.stats import t as student_t
+except ImportError:
+    student_t = None
+
+DEFAULT_SIZES = (20, 40, 60, 80, 100)
+
+
+def _critical_value(confidence, samples):
+    if student_t is not None and samples > 1:
+        return student_t.ppf((1 + confidence) / 2, samples - 1)
+    return NormalDist().inv_cdf((1 + confidence) / 2)
+
+
+# One random instance sized as in latency_Time.py: 20% switches and
+# ceil(10%) controllers; returns its result as a results_store row
+def _run_instance(args):
+    topology_type, num_nodes, weighted, connection_prob, trials, seed = args
+    rng = np.random.default_rng(seed)
+    num_switches = max(1, int(num_nodes * 0.2))
+    num_controllers = math.ceil(num_nodes * 0.1)
+    ig = generate_topology(topology_type, num_switches, num_nodes - num_switches, rng,
+                           connection_prob=connection_prob, weighted=weighted)
+    start = time.perf_counter()
+    controllers, latency = place_controllers(ig, num_controllers, trials=trials, seed=rng)
+    return {'topology_type': topology_type, 'num_nodes': num_nodes, 'num_switches': num_switches,
+            'num_hosts': num_nodes - num_switches, 'connection_prob': connection_prob, 'weighted': weighted,
+            'seed': seed, 'k': num_controllers, 'placement': controllers, 'max_latency': latency,
+            'elapsed_ms': (time.perf_counter() - start) * 1e3}
+
+
+class CellStats:
+    def __init__(self):
+        self.samples = []
+
+    @property
+    def count(self):
+        return len(self.samples)
+
+    @property
+    def mean(self):
+        return float(np.mean(self.samples))
+
+    @property
+    def std(self):
+        return float(np.std(self.samples, ddof=1)) if self.count > 1 else float('inf')
+
+    def half_width(self, confidence):
+        return _critical_value(confidence, self.count) * self.std / math.sqrt(self.count)
+
+    # Samples still needed for the interval to reach rel_tol of the mean
+    def remaining(self, confidence, rel_tol):
+        if self.count < 2:
+            return float('inf')
+        target = rel_tol * abs(self.mean)
+        if target == 0:
+            return 0 if self.std == 0 else float('inf')
+        needed = (_critical_value(confidence, self.count) * self.std / target) ** 2
+        return max(0.0, needed - self.count)
+
+
+# Monte Carlo study of min-max latency per (topology type, node count).
+# Instances run in parallel in rounds. A cell stops once its confidence
+# interval half-width is within rel_tol of the mean (or at max_samples),
+# and each round gives a cell only as many new instances as its variance
+# says it still needs, so compute goes where the estimate is noisiest.
+# With a ResultsStore every instance is also recorded there.
+def run_study(topology_types=TOPOLOGY_TYPES, sizes=DEFAULT_SIZES, weighted=False, connection_prob=0.1,
+              trials=1000, confidence=0.95, rel_tol=0.05, min_samples=10, max_samples=500,
+              batch_size=32, workers=None, seed=None, store=None):
+    cells = {(topology_type, size): CellStats() for topology_type in topology_types for size in sizes}
+    seeds = np.random.SeedSequence(seed)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while True:
+            jobs, owners = [], []
+            for key, stats in cells.items():
+                if stats.count >= max_samples:
+                    continue
+                if stats.count < min_samples:
+                    wanted = min_samples - stats.count
+                else:
+                    wanted = math.ceil(min(stats.remaining(confidence, rel_tol), batch_size))
+                wanted = min(wanted, max_samples - stats.count)
+                for child in seeds.spawn(wanted):
+                    instance_seed = int(child.generate_state(1, np.uint64)[0] >> np.uint64(1))
+                    jobs.append((key[0], key[1], weighted, connection_prob, trials, instance_seed))
+                    owners.append(key)
+            if not jobs:
+                break
+            for key, run in zip(owners, executor.map(_run_instance, jobs, chunksize=4)):
+                cells[key].samples.append(run['max_latency'])
+                if store is not None:
+                    store.add(**run)
+            if store is not None:
+                store.flush()
+
+    results = {}
+    for key, stats in cells.items():
+        half = float(stats.half_width(confidence))
+        results[key] = {
+            'samples': stats.count,
+            'mean': stats.mean,
+            'std': stats.std,
+            'ci': (stats.mean - half, stats.mean + half),
+            'converged': bool(half <= rel_tol * abs(stats.mean)),
+        }
+    return results
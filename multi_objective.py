@@ -0,0 +1,68 @@
+import time
+
+import numpy as np
+
+from graph_index import index_graph
+from distance_matrix import distance_matrix, unreachable
+from placement import CHUNK_ELEMENTS, RANDOM_BATCH, random_placements
+
+OBJECTIVE_NAMES = ('max_latency', 'avg_latency', 'inter_controller_latency')
+
+
+# Max and average switch-to-controller latency plus the worst
+# controller-to-controller latency of many placements, from one gather
+# per chunk; float64 with inf for unreachable pairs, shape (placements, 3)
+def evaluate_objectives(D, placements):
+    n = D.shape[0]
+    num_placements, k = placements.shape
+    sentinel = unreachable(D.dtype)
+    scores = np.empty((num_placements, 3))
+    step = max(1, CHUNK_ELEMENTS // (n * k))
+    for start in range(0, num_placements, step):
+        chunk = placements[start:start + step]
+        nearest = D[:, chunk].min(axis=2)
+        cut = (nearest == sentinel).any(axis=0)
+        scores[start:start + step, 0] = np.where(cut, np.inf, nearest.max(axis=0))
+        scores[start:start + step, 1] = np.where(cut, np.inf, nearest.mean(axis=0, dtype=np.float64))
+
+        between = D[chunk[:, :, None], chunk[:, None, :]]
+        split = (between == sentinel).any(axis=(1, 2))
+        scores[start:start + step, 2] = np.where(split, np.inf, between.max(axis=(1, 2)))
+    return scores
+
+
+# Indices of the rows not dominated by any other row (lower is better)
+def pareto_front(scores):
+    keep = np.ones(len(scores), dtype=bool)
+    step = max(1, CHUNK_ELEMENTS // max(1, len(scores) * scores.shape[1]))
+    for start in range(0, len(scores), step):
+        rows = scores[start:start + step, None, :]
+        dominated = ((scores[None] <= rows).all(axis=2) & (scores[None] < rows).any(axis=2)).any(axis=1)
+        keep[start:start + step] = ~dominated
+    return np.flatnonzero(keep)
+
+
+# Random search that keeps an archive of non-dominated placements. Returns
+# (placement, objectives) pairs ordered by max latency.
+def place_controllers_pareto(G, num_controllers, trials=1000, weight=None, seed=None, time_budget=None):
+    ig = index_graph(G, weight=weight)
+    D = distance_matrix(ig)
+    rng = np.random.default_rng(seed)
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+
+    front = np.empty((0, num_controllers), dtype=np.int32)
+    front_scores = np.empty((0, 3))
+    for start in range(0, trials, RANDOM_BATCH):
+        batch = random_placements(rng, ig.num_nodes, num_controllers, min(RANDOM_BATCH, trials - start))
+        batch.sort(axis=1)
+        candidates = np.concatenate([front, batch])
+        candidate_scores = np.concatenate([front_scores, evaluate_objectives(D, batch)])
+        candidates, unique = np.unique(candidates, axis=0, return_index=True)
+        candidate_scores = candidate_scores[unique]
+        keep = pareto_front(candidate_scores)
+        front, front_scores = candidates[keep], candidate_scores[keep]
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+
+    order = np.lexsort(front_scores.T[::-1])
+    return [(ig.to_labels(front[i]), tuple(front_scores[i].tolist())) for i in order]
@@ -0,0 +1,151 @@
+import time
+
+import numpy as np
+
+import kernels
+from graph_index import index_graph
+from distance_matrix import as_latency, distance_matrix, unreachable
+
+# Upper bound on elements of the (nodes, placements, controllers) gather per chunk
+CHUNK_ELEMENTS = 1 << 22
+
+
+OBJECTIVES = ('max', 'avg')
+
+# Candidates drawn per batch by the random search between time-budget checks
+RANDOM_BATCH = 256
+
+
+# The compiled kernels do no bounds checks, so placements are validated
+# once here for both backends
+def check_placements(D, placements):
+    if placements.shape[1] < 1:
+        raise ValueError("A placement needs at least one controller")
+    if placements.size and (placements.min() < 0 or placements.max() >= D.shape[1]):
+        raise ValueError(f"Controller ids must be in [0, {D.shape[1]})")
+
+
+def compute_max_latency(D, controllers):
+    placement = np.asarray(controllers, dtype=np.int64).reshape(1, -1)
+    check_placements(D, placement)
+    if kernels.USE_NUMBA:
+        rows = D if D.shape[0] == D.shape[1] else D.T
+        return as_latency(kernels.max_min_scores(rows, placement.astype(np.int32))[0], D.dtype)
+    return as_latency(D[:, placement[0]].min(axis=1).max(), D.dtype)
+
+
+def score_dtype(D, objective):
+    return D.dtype if objective == 'max' else np.dtype(np.float64)
+
+
+# Reduce per-node nearest-controller latencies along axis to the objective;
+# 'max' keeps D's dtype, 'avg' is float64 with inf for unreachable nodes
+def reduce_nearest(nearest, objective, axis=0):
+    if objective == 'max':
+        return nearest.max(axis=axis)
+    if objective == 'avg':
+        avg = nearest.mean(axis=axis, dtype=np.float64)
+        return np.where((nearest == unreachable(nearest.dtype)).any(axis=axis), np.inf, avg)
+    raise ValueError(f"Unknown objective: {objective}")
+
+
+# Objective of many placements (rows of an int array) at once. D is
+# (nodes, candidates); placements index its columns.
+def score_placements(D, placements, objective='max'):
+    check_placements(D, placements)
+    if kernels.USE_NUMBA and objective in OBJECTIVES:
+        placements = np.ascontiguousarray(placements, dtype=np.int32)
+        # The kernels read one row per candidate; a square D is symmetric
+        rows = D if D.shape[0] == D.shape[1] else D.T
+        if objective == 'max':
+            return kernels.max_min_scores(rows, placements)
+        return kernels.mean_min_scores(rows, placements, unreachable(D.dtype))
+
+    n = D.shape[0]
+    num_placements, k = placements.shape
+    scores = np.empty(num_placements, dtype=score_dtype(D, objective))
+    step = max(1, CHUNK_ELEMENTS // (n * k))
+    for start in range(0, num_placements, step):
+        chunk = placements[start:start + step]
+        scores[start:start + step] = reduce_nearest(D[:, chunk].min(axis=2), objective)
+    return scores
+
+
+def random_placements(rng, num_nodes, num_controllers, num_placements):
+    placements = np.empty((num_placements, num_controllers), dtype=np.int32)
+    step = max(1, CHUNK_ELEMENTS // num_nodes)
+    for start in range(0, num_placements, step):
+        size = min(step, num_placements - start)
+        keys = rng.random((size, num_nodes))
+        placements[start:start + size] = np.argpartition(keys, num_controllers - 1, axis=1)[:, :num_controllers]
+    return placements
+
+
+def random_search(D, num_controllers, rng, objective='max', trials=1000, time_budget=None):
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    best, best_score = None, None
+    for start in range(0, trials, RANDOM_BATCH):
+        placements = random_placements(rng, D.shape[1], num_controllers, min(RANDOM_BATCH, trials - start))
+        scores = score_placements(D, placements, objective)
+        i = np.argmin(scores)
+        if best is None or scores[i] < best_score:
+            best, best_score = placements[i], scores[i]
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+    return best, best_score
+
+
+# Search controller ids on a precomputed distance matrix; returns the ids
+# and the objective value as a plain number
+def search_placement(D, num_controllers, trials=1000, seed=None, strategy='random', objective='max',
+                     time_budget=None):
+    rng = np.random.default_rng(seed)
+
+    if strategy == 'random':
+        # Heuristic: Randomly select controller placements and evaluate
+        best, score = random_search(D, num_controllers, rng, objective, trials, time_budget)
+    else:
+        from metaheuristics import STRATEGIES
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown placement strategy: {strategy}")
+        best, score = STRATEGIES[strategy](D, num_controllers, rng, objective, time_budget=time_budget)
+
+    return best, as_latency(score, score_dtype(D, objective))
+
+
+def place_controllers(G, num_controllers, trials=1000, weight=None, seed=None,
+                      strategy='random', objective='max', time_budget=None):
+    ig = index_graph(G, weight=weight)
+    D = distance_matrix(ig)
+    best, latency = search_placement(D, num_controllers, trials, seed, strategy, objective, time_budget)
+    return ig.to_labels(best), latency
+
+
+# Split num_controllers across groups: at least one each, the rest in
+# proportion to need (largest remainder), never more than a group's limit
+def allocate_controllers(need, num_controllers, limit=None):
+    need = np.asarray(need, dtype=np.float64)
+    limit = np.full(len(need), num_controllers) if limit is None else np.asarray(limit)
+    if num_controllers < len(need):
+        raise ValueError(f"{num_controllers} controllers cannot cover {len(need)} groups")
+    if num_controllers > limit.sum():
+        raise ValueError(f"{num_controllers} controllers exceed the {limit.sum()} available nodes")
+
+    counts = np.ones(len(need), dtype=np.int64)
+    spare = num_controllers - len(need)
+    if spare:
+        share = need / need.sum() * spare if need.sum() > 0 else np.full(len(need), spare / len(need))
+        counts += np.floor(share).astype(np.int64)
+        remainder = num_controllers - counts.sum()
+        counts[np.argsort(np.floor(share) - share, kind='stable')[:remainder]] += 1
+
+    # Hand controllers above a group's limit to the neediest groups with room
+    excess = np.maximum(counts - limit, 0).sum()
+    counts = np.minimum(counts, limit)
+    for group in np.argsort(-need, kind='stable'):
+        if not excess:
+            break
+        extra = min(excess, limit[group] - counts[group])
+        counts[group] += extra
+        excess -= extra
+    return counts
@@ -0,0 +1,252 @@
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import socket
+import socketserver
+import stat
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from graph_index import HOST, SWITCH, from_edges
+from distance_matrix import distance_matrix
+from placement import compute_max_latency, search_placement
+
+DEFAULT_ADDRESS = ('127.0.0.1', 8642)
+
+
+# Graph payload: {"edges": [[u, v], ...] or [[u, v, latency], ...],
+# optional "nodes" (isolated nodes too) and "hosts"}
+def graph_from_json(spec):
+    edges = spec['edges']
+    lengths = {len(edge) for edge in edges}
+    if not lengths <= {2, 3} or len(lengths) > 1:
+        raise ValueError("Edges must all be [u, v] or all be [u, v, latency]")
+    labels = list(dict.fromkeys([*spec.get('nodes', []), *(u for u, *_ in edges), *(v for _, v, *_ in edges)]))
+    index = {label: i for i, label in enumerate(labels)}
+    src = np.array([index[edge[0]] for edge in edges], dtype=np.int64)
+    dst = np.array([index[edge[1]] for edge in edges], dtype=np.int64)
+    weighted = lengths == {3}
+    weights = np.array([float(edge[2]) for edge in edges]) if weighted else None
+    hosts = set(spec.get('hosts', ()))
+    node_type = np.array([HOST if label in hosts else SWITCH for label in labels], dtype=np.uint8)
+    label_array = np.empty(len(labels), dtype=object)
+    label_array[:] = labels
+    return from_edges(label_array, node_type, src, dst, weights)
+
+
+def graph_key(ig):
+    digest = hashlib.sha1(ig.indptr.tobytes())
+    digest.update(ig.indices.tobytes())
+    if ig.weights is not None:
+        digest.update(ig.weights.tobytes())
+    digest.update(json.dumps(ig.labels.tolist()).encode())
+    return digest.hexdigest()
+
+
+# Least-recently-used (graph, distance matrix) entries keyed by graph_key
+class MatrixCache:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        with self.lock:
+            self.entries[key] = entry
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.capacity:
+                self.entries.popitem(last=False)
+
+
+# Placement requests against warm distance matrices. A request names its
+# topology by "graph_id" (returned by every call) or sends the "graph"
+# itself; computation runs on a fixed pool of worker threads.
+class PlacementService:
+    def __init__(self, cache_size=32, workers=None):
+        self.cache = MatrixCache(cache_size)
+        self.executor = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+
+    def resolve(self, payload):
+        if 'graph' in payload:
+            ig = graph_from_json(payload['graph'])
+            key = graph_key(ig)
+        else:
+            key = payload['graph_id']
+        entry = self.cache.get(key)
+        if entry is not None:
+            return key, entry, True
+        if 'graph' not in payload:
+            raise LookupError(f"Unknown graph_id {key}, send the graph again")
+        entry = (ig, distance_matrix(ig))
+        self.cache.put(key, entry)
+        return key, entry, False
+
+    def register(self, payload):
+        key, (ig, _), cached = self.resolve(payload)
+        return {'graph_id': key, 'nodes': ig.num_nodes, 'cached': cached}
+
+    def place(self, payload):
+        key, (ig, D), cached = self.resolve(payload)
+        num_controllers = int(payload['num_controllers'])
+        if not 1 <= num_controllers <= ig.num_nodes:
+            raise ValueError(f"num_controllers must be between 1 and {ig.num_nodes}")
+        best, latency = search_placement(D, num_controllers, payload.get('trials', 1000),
+                                         payload.get('seed'), payload.get('strategy', 'random'),
+                                         payload.get('objective', 'max'), payload.get('time_budget'))
+        return {'graph_id': key, 'cached': cached, 'controllers': ig.to_labels(best), 'latency': latency}
+
+    def latency(self, payload):
+        key, (ig, D), cached = self.resolve(payload)
+        if not payload['controllers']:
+            raise ValueError("controllers must not be empty")
+        latency = compute_max_latency(D, ig.ids(payload['controllers']))
+        return {'graph_id': key, 'cached': cached, 'latency': latency}
+
+    def health(self, payload):
+        cache = self.cache
+        return {'graphs': len(cache.entries), 'hits': cache.hits, 'misses': cache.misses}
+
+    def handle(self, route, payload):
+        start = time.perf_counter()
+        result = self.executor.submit(getattr(self, route), payload).result()
+        result['elapsed_ms'] = (time.perf_counter() - start) * 1e3
+        return result
+
+
+ROUTES = {
+    ('POST', '/graphs'): 'register',
+    ('POST', '/place'): 'place',
+    ('POST', '/latency'): 'latency',
+    ('GET', '/health'): 'health',
+}
+
+
+class PlacementHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _dispatch(self, method):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        route = ROUTES.get((method, self.path))
+        if route is None:
+            return self._reply(404, {'error': f"No route {method} {self.path}"})
+        try:
+            payload = json.loads(body) if body else {}
+            result = self.server.service.handle(route, payload)
+        except KeyError as e:
+            return self._reply(400, {'error': f"Missing or unknown {e}"})
+        except LookupError as e:
+            return self._reply(404, {'error': str(e)})
+        except (TypeError, ValueError) as e:
+            return self._reply(400, {'error': str(e)})
+        except Exception as e:
+            # Keep serving other clients whatever one request trips over
+            return self._reply(500, {'error': f"{type(e).__name__}: {e}"})
+        self._reply(200, result)
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+    def get_request(self):
+        request, _ = super().get_request()
+        return request, ('unix', 0)
+
+
+# HTTP/JSON server on a (host, port) pair or, given a path, a Unix socket
+def make_server(address=DEFAULT_ADDRESS, cache_size=32, workers=None):
+    if isinstance(address, str):
+        # Only a stale socket is removed, never any other file at that path
+        if os.path.exists(address) and stat.S_ISSOCK(os.stat(address).st_mode):
+            os.unlink(address)
+        server = UnixHTTPServer(address, PlacementHandler)
+    else:
+        server = ThreadingHTTPServer(address, PlacementHandler)
+    server.service = PlacementService(cache_size, workers)
+    return server
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__('localhost', timeout=timeout)
+        self.path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.path)
+
+
+# One request to a running service; returns the decoded JSON reply
+def call(address, route, payload=None, timeout=None):
+    if isinstance(address, str):
+        connection = UnixHTTPConnection(address, timeout=timeout)
+    else:
+        connection = http.client.HTTPConnection(*address, timeout=timeout)
+    try:
+        if payload is None:
+            connection.request('GET', route)
+        else:
+            connection.request('POST', route, json.dumps(payload), {'Content-Type': 'application/json'})
+        response = connection.getresponse()
+        body = json.loads(response.read())
+    finally:
+        connection.close()
+    if response.status != 200:
+        raise RuntimeError(f"{response.status}: {body.get('error')}")
+    return body
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Controller placement service")
+    parser.add_argument('--host', default=DEFAULT_ADDRESS[0])
+    parser.add_argument('--port', type=int, default=DEFAULT_ADDRESS[1])
+    parser.add_argument('--socket', help="serve on this Unix socket path instead of TCP")
+    parser.add_argument('--cache-size', type=int, default=32)
+    parser.add_argument('--workers', type=int)
+    args = parser.parse_args()
+
+    server = make_server(args.socket or (args.host, args.port), args.cache_size, args.workers)
+    print("Serving placement on", args.socket or f"http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
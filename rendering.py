@@ -0,0 +1,223 @@
+import hashlib
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import networkx as nx
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from graph_index import SWITCH, index_graph
+from distance_matrix import csr_matrix
+
+SWITCH_COLOR = 'blue'
+HOST_COLOR = 'green'
+CONTROLLER_COLOR = 'red'
+
+# Node labels are only drawn on graphs up to this size
+LABEL_LIMIT = 100
+
+# networkx's default spring iterations, and the node-pair updates a
+# force-directed layout may spend in total
+SPRING_ITERATIONS = 50
+SPRING_BUDGET = 2 * 10 ** 7
+
+_LAYOUT_CACHE = {}
+
+
+def graph_fingerprint(ig):
+    digest = hashlib.sha1(ig.indptr.tobytes())
+    digest.update(ig.indices.tobytes())
+    digest.update(ig.node_type.tobytes())
+    digest.update(repr(ig.labels.tolist()).encode())
+    return digest.hexdigest()
+
+
+def _parent_switch(ig, hosts, is_switch):
+    parents = np.full(len(hosts), -1)
+    for i, host in enumerate(hosts):
+        nbrs = ig.neighbors(host)
+        nbrs = nbrs[is_switch[nbrs]]
+        if nbrs.size:
+            parents[i] = nbrs[0]
+    return parents
+
+
+# Walk a ring or a bus of switches from start, following unvisited neighbours
+def _chain_order(ig, switches, is_switch, start):
+    visited = np.zeros(ig.num_nodes, dtype=bool)
+    order = []
+    node = start
+    while node is not None:
+        visited[node] = True
+        order.append(node)
+        nbrs = ig.neighbors(node)
+        nbrs = nbrs[is_switch[nbrs] & ~visited[nbrs]]
+        node = nbrs[0] if nbrs.size else None
+    order.extend(s for s in switches if not visited[s])
+    return np.array(order, dtype=np.int64)
+
+
+# Fan each switch's hosts out at the given radius, away from center (or on a
+# full circle when the switch sits on the center)
+def _fan_hosts(ig, pos, is_switch, center, radius, width=np.pi / 3):
+    hosts = np.flatnonzero(~is_switch)
+    parents = _parent_switch(ig, hosts, is_switch)
+    for parent in np.unique(parents):
+        group = hosts[parents == parent]
+        origin = pos[parent] if parent >= 0 else np.zeros(2)
+        direction = origin - center(origin)
+        if np.hypot(*direction) < 1e-9:
+            angles = 2 * np.pi * np.arange(len(group)) / len(group)
+        else:
+            base = np.arctan2(direction[1], direction[0])
+            angles = base + np.linspace(-width / 2, width / 2, len(group)) if len(group) > 1 else [base]
+        pos[group] = origin + radius * np.column_stack([np.cos(angles), np.sin(angles)])
+
+
+def circular_layout(ig):
+    is_switch = ig.node_type & SWITCH > 0
+    switches = np.flatnonzero(is_switch)
+    pos = np.zeros((ig.num_nodes, 2))
+    order = _chain_order(ig, switches, is_switch, switches[0]) if switches.size else switches
+    angles = 2 * np.pi * np.arange(len(order)) / max(len(order), 1)
+    pos[order] = np.column_stack([np.cos(angles), np.sin(angles)])
+    _fan_hosts(ig, pos, is_switch, lambda origin: np.zeros(2), min(0.4, np.pi / max(len(order), 1)))
+    return pos
+
+
+def linear_layout(ig):
+    is_switch = ig.node_type & SWITCH > 0
+    switches = np.flatnonzero(is_switch)
+    pos = np.zeros((ig.num_nodes, 2))
+    if switches.size:
+        switch_degree = np.array([is_switch[ig.neighbors(s)].sum() for s in switches])
+        start = switches[np.argmin(switch_degree)]
+        order = _chain_order(ig, switches, is_switch, start)
+        pos[order, 0] = np.arange(len(order))
+    _fan_hosts(ig, pos, is_switch, lambda origin: origin + [0.0, 1.0], 0.45, width=np.pi / 2)
+    return pos
+
+
+# Analytic star layout: hub at the origin, other switches on the unit
+# circle, hosts fanned outwards from their switch
+def radial_layout(ig):
+    is_switch = ig.node_type & SWITCH > 0
+    switches = np.flatnonzero(is_switch)
+    pos = np.zeros((ig.num_nodes, 2))
+    if switches.size:
+        hub = switches[np.argmax([is_switch[ig.neighbors(s)].sum() for s in switches])]
+        spokes = switches[switches != hub]
+        angles = 2 * np.pi * np.arange(len(spokes)) / max(len(spokes), 1)
+        pos[spokes] = np.column_stack([np.cos(angles), np.sin(angles)])
+        pos[hub] = 0.0
+    _fan_hosts(ig, pos, is_switch, lambda origin: np.zeros(2), min(0.4, np.pi / max(len(switches), 1)))
+    return pos
+
+
+def _force_layout(ig, nodes):
+    G = nx.Graph()
+    G.add_nodes_from(range(len(nodes)))
+    local = np.full(ig.num_nodes, -1)
+    local[nodes] = np.arange(len(nodes))
+    src = np.repeat(local, np.diff(ig.indptr))
+    dst = local[ig.indices]
+    keep = (src >= 0) & (dst >= 0)
+    G.add_edges_from(zip(src[keep].tolist(), dst[keep].tolist()))
+
+    iterations = min(SPRING_ITERATIONS, SPRING_BUDGET // max(len(nodes), 1) ** 2)
+    if iterations == SPRING_ITERATIONS:
+        placed = nx.spring_layout(G, seed=0)
+    else:
+        placed = nx.spectral_layout(G) if csr_matrix is not None else nx.random_layout(G, seed=0)
+        if iterations:
+            placed = nx.spring_layout(G, pos=placed, iterations=iterations, seed=0)
+    return np.array([placed[i] for i in range(len(nodes))])
+
+
+# Force-directed layout for the other types. Spring iterations cost O(n^2),
+# so only switches are laid out when the graph has hosts (hosts are fanned
+# out around their switch), and the refinement gets at most SPRING_BUDGET
+# node-pair updates: small graphs get networkx's full run, larger ones
+# fewer iterations from a spectral start, the largest the spectral layout.
+def spring_layout(ig):
+    is_switch = ig.node_type & SWITCH > 0
+    switches = np.flatnonzero(is_switch)
+    if not switches.size or switches.size == ig.num_nodes:
+        return _force_layout(ig, np.arange(ig.num_nodes))
+    pos = np.zeros((ig.num_nodes, 2))
+    pos[switches] = _force_layout(ig, switches)
+    center = pos[switches].mean(axis=0)
+    spread = np.ptp(pos[switches], axis=0).max() or 1.0
+    _fan_hosts(ig, pos, is_switch, lambda origin: center, spread / max(20, np.sqrt(len(switches))))
+    return pos
+
+
+LAYOUTS = {
+    'ring': circular_layout,
+    'bus': linear_layout,
+    'star': radial_layout,
+}
+
+
+# Deterministic layout for the topology type, computed once per graph
+def layout(ig, topology_type=None):
+    key = (topology_type, graph_fingerprint(ig))
+    if key not in _LAYOUT_CACHE:
+        _LAYOUT_CACHE[key] = LAYOUTS.get(topology_type, spring_layout)(ig)
+    return _LAYOUT_CACHE[key]
+
+
+# Draw a topology headless (Agg canvas, no pyplot) with edges as one
+# LineCollection and nodes as one scatter, and save it; the format follows
+# the file extension (png, svg, ...)
+def render_topology(G, controllers, path, topology_type=None, pos=None, hosts=None, title=None,
+                    figsize=(10, 8), dpi=100):
+    ig = index_graph(G, hosts=hosts)
+    if pos is None:
+        pos = layout(ig, topology_type)
+    elif isinstance(pos, dict):
+        pos = np.array([pos[label] for label in ig.labels], dtype=np.float64)
+
+    colors = np.where(ig.node_type & SWITCH > 0, SWITCH_COLOR, HOST_COLOR).astype(object)
+    sizes = np.where(ig.node_type & SWITCH > 0, 500, 300).astype(np.float64)
+    controller_ids = ig.ids(controllers)
+    colors[controller_ids] = CONTROLLER_COLOR
+    sizes[controller_ids] = 700
+    if ig.num_nodes > LABEL_LIMIT:
+        sizes *= 30.0 / 700
+
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    src = np.repeat(np.arange(ig.num_nodes), np.diff(ig.indptr))
+    once = src < ig.indices
+    segments = np.stack([pos[src[once]], pos[ig.indices[once]]], axis=1)
+    ax.add_collection(LineCollection(segments, colors='gray', linewidths=0.8, zorder=1))
+    ax.scatter(pos[:, 0], pos[:, 1], c=colors.tolist(), s=sizes, zorder=2)
+    if ig.num_nodes <= LABEL_LIMIT:
+        for label, (x, y) in zip(ig.labels, pos):
+            ax.annotate(str(label), (x, y), ha='center', va='center', fontsize=8, zorder=3)
+    if title:
+        ax.set_title(title)
+    ax.set_axis_off()
+    ax.autoscale_view()
+    fig.savefig(path)
+    return path
+
+
+def _render_job(job):
+    return render_topology(**job)
+
+
+# Render many topologies (keyword-argument dicts for render_topology) in
+# parallel worker processes, e.g. every graph of a parameter sweep
+def render_many(jobs, workers=None):
+    jobs = list(jobs)
+    for job in jobs:
+        directory = os.path.dirname(job['path'])
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_render_job, jobs))
@@ -0,0 +1,214 @@
+import numpy as np
+
+from graph_index import HOST, SWITCH, from_edges, index_graph
+from distance_matrix import distance_matrix, nearest_source_distances, unreachable
+from metaheuristics import nearest_without_slot
+from placement import search_placement
+from threshold import farthest_first
+
+
+# Change to a topology by label: edges to add ((u, v) or (u, v, latency);
+# endpoints not yet in the graph become new nodes, HOST if listed in
+# hosts), edges to remove, and nodes to remove with all their links
+class GraphDelta:
+    def __init__(self, add_edges=(), remove_edges=(), remove_nodes=(), hosts=()):
+        self.add_edges = [tuple(edge) for edge in add_edges]
+        self.remove_edges = {frozenset(edge) for edge in remove_edges}
+        self.remove_nodes = set(remove_nodes)
+        self.hosts = set(hosts)
+
+    def apply(self, ig):
+        if ig.weights is not None and any(len(edge) < 3 for edge in self.add_edges):
+            raise ValueError("Added edges need a latency on a weighted graph")
+        labels = [label for label in ig.labels if label not in self.remove_nodes]
+        known = set(labels)
+        for u, v, *_ in self.add_edges:
+            for label in (u, v):
+                if label not in known:
+                    labels.append(label)
+                    known.add(label)
+        index = {label: i for i, label in enumerate(labels)}
+        node_type = np.array([ig.node_type[ig.index[label]] if label in ig.index else
+                              (HOST if label in self.hosts else SWITCH) for label in labels], dtype=np.uint8)
+
+        src = np.repeat(np.arange(ig.num_nodes), np.diff(ig.indptr))
+        once = src < ig.indices
+        edges = [(ig.labels[u], ig.labels[v]) for u, v in zip(src[once].tolist(), ig.indices[once].tolist())]
+        weights = ig.weights[once].tolist() if ig.weights is not None else [1.0] * len(edges)
+        keep = [u in index and v in index and frozenset((u, v)) not in self.remove_edges for u, v in edges]
+        edges = [edge for edge, kept in zip(edges, keep) if kept] + [(u, v) for u, v, *_ in self.add_edges]
+        weights = [w for w, kept in zip(weights, keep) if kept] + [rest[0] if rest else 1.0
+                                                                   for _, _, *rest in self.add_edges]
+
+        label_array = np.empty(len(labels), dtype=object)
+        label_array[:] = labels
+        src = np.array([index[u] for u, _ in edges], dtype=np.int64)
+        dst = np.array([index[v] for _, v in edges], dtype=np.int64)
+        return from_edges(label_array, node_type, src, dst,
+                          np.array(weights, dtype=np.float64) if ig.weights is not None else None)
+
+    # When the delta only attaches new leaves (one link to an existing node)
+    # and drops existing leaves, no shortest path between the other nodes
+    # changes. Returns {new leaf: (parent, latency)} then, otherwise None.
+    def leaf_changes(self, ig):
+        for label in self.remove_nodes:
+            if label in ig.index and len(ig.neighbors(ig.index[label])) > 1:
+                return None
+        if any(not (edge & self.remove_nodes) for edge in self.remove_edges):
+            return None
+        leaves = {}
+        for u, v, *rest in self.add_edges:
+            new = [label for label in (u, v) if label not in ig.index]
+            if len(new) != 1 or new[0] in leaves:
+                return None
+            parent = v if new[0] == u else u
+            if parent in self.remove_nodes:
+                return None
+            # apply() drops latencies on hop-count graphs, so a leaf is one hop there
+            leaves[new[0]] = (parent, rest[0] if rest and ig.weights is not None else 1.0)
+        return leaves
+
+
+# Per-node distance columns (float64, inf if unreachable), computed on first
+# use by a single-source search, or by `derive` when it can produce one from
+# an earlier graph's columns without searching
+class DistanceColumns:
+    def __init__(self, ig, derive=None):
+        self.ig = ig
+        self.derive = derive
+        self.columns = {}
+        self.searches = 0
+
+    def __getitem__(self, node):
+        column = self.columns.get(node)
+        if column is None:
+            column = self.derive(node) if self.derive is not None else None
+            if column is None:
+                column, _ = nearest_source_distances(self.ig, [node])
+                self.searches += 1
+            self.columns[node] = column
+        return column
+
+    def matrix(self, nodes):
+        return np.column_stack([self[node] for node in nodes]).reshape(self.ig.num_nodes, len(nodes))
+
+
+def _matrix_column(D, node):
+    column = D[node].astype(np.float64)
+    column[D[node] == unreachable(D.dtype)] = np.inf
+    return column
+
+
+def _matrix_columns(ig, D):
+    return DistanceColumns(ig, lambda node: _matrix_column(D, node))
+
+
+# Columns of the new graph read from the old graph's columns: unchanged
+# nodes keep their distances and a new leaf is its parent plus one link.
+# Old columns come from the old graph's computed columns or, right after
+# initial_state, its distance matrix. The old DistanceColumns itself is not
+# kept, so states never chain back to earlier graphs; columns neither
+# source has are searched for.
+def _leaf_columns(old_ig, old_columns, ig, leaves, old_matrix=None):
+    old_cached = old_columns.columns
+    old_id = np.array([old_ig.index.get(label, -1) for label in ig.labels])
+    kept = np.flatnonzero(old_id >= 0)
+    leaf_ids = ig.ids(list(leaves))
+    parent_ids = ig.ids([parent for parent, _ in leaves.values()])
+    leaf_weights = np.array([weight for _, weight in leaves.values()], dtype=np.float64)
+    parent_of = dict(zip(leaf_ids.tolist(), zip(parent_ids.tolist(), leaf_weights.tolist())))
+
+    def derive(node):
+        if node in parent_of:
+            parent, weight = parent_of[node]
+            column = derive(parent)
+            if column is None:
+                return None
+            column = column + weight
+            column[node] = 0.0
+            return column
+        old_column = old_cached.get(old_id[node])
+        if old_column is None and old_matrix is not None:
+            old_column = _matrix_column(old_matrix, old_id[node])
+        if old_column is None:
+            return None
+        column = np.empty(ig.num_nodes)
+        column[kept] = old_column[old_id[kept]]
+        column[leaf_ids] = column[parent_ids] + leaf_weights
+        return column
+    return DistanceColumns(ig, derive)
+
+
+# Placement on one topology snapshot, carried into the next replace call.
+# matrix is the APSP matrix of an initial state, kept for the first replace
+# only; later states have just their columns.
+class PlacementState:
+    def __init__(self, ig, columns, controllers, latency, migrations=0, matrix=None):
+        self.ig = ig
+        self.columns = columns
+        self.controllers = controllers
+        self.latency = latency
+        self.migrations = migrations
+        self.matrix = matrix
+
+
+def initial_state(G, num_controllers, trials=1000, weight=None, seed=None):
+    ig = index_graph(G, weight=weight)
+    D = distance_matrix(ig)
+    best, latency = search_placement(D, num_controllers, trials, seed)
+    return PlacementState(ig, _matrix_columns(ig, D), ig.to_labels(best), latency, matrix=D)
+
+
+# Bounded local search from `controllers` minimising max latency plus
+# migration_cost per controller not in `previous`. Moves swap one
+# controller for the worst-served node or a neighbour of it or of a
+# controller, so only those nodes' columns are ever needed.
+def local_search(ig, columns, controllers, previous, migration_cost=1.0, max_iters=50):
+    controllers = np.array(controllers, dtype=np.int64)
+    previous = np.asarray(list(previous), dtype=np.int64)
+    cols = columns.matrix(controllers)
+    moved = np.count_nonzero(~np.isin(controllers, previous))
+    latency = cols.min(axis=1).max()
+
+    for _ in range(max_iters):
+        worst = int(np.argmax(cols.min(axis=1)))
+        candidates = np.unique(np.concatenate([[worst], ig.neighbors(worst)] +
+                                              [ig.neighbors(c) for c in controllers]))
+        candidates = candidates[~np.isin(candidates, controllers)]
+        if not candidates.size:
+            break
+        scores = np.minimum(nearest_without_slot(cols)[:, None, :], columns.matrix(candidates).T[None]).max(axis=2)
+        # Migrations after swapping slot i for candidate j
+        moves = moved - ~np.isin(controllers, previous)[:, None] + ~np.isin(candidates, previous)[None, :]
+        cost = scores + migration_cost * moves
+        slot, j = np.unravel_index(np.argmin(cost), cost.shape)
+        if not cost[slot, j] < latency + migration_cost * moved:
+            break
+        controllers[slot] = candidates[j]
+        cols[:, slot] = columns[candidates[j]]
+        moved, latency = moves[slot, j], scores[slot, j]
+    return controllers, latency, int(moved)
+
+
+# Re-place controllers after a topology change, starting from the previous
+# placement. Controllers whose node survives stay put unless moving them
+# pays for its migration cost; removed ones are replaced farthest-first.
+# Distances come from the previous state's columns when the delta only
+# touches leaves, and otherwise from single-source searches on demand.
+def replace_controllers(state, delta, migration_cost=1.0, max_iters=50, seed=None):
+    ig = delta.apply(state.ig)
+    leaves = delta.leaf_changes(state.ig)
+    if leaves is None:
+        columns = DistanceColumns(ig)
+    else:
+        columns = _leaf_columns(state.ig, state.columns, ig, leaves, state.matrix)
+
+    kept = [label for label in state.controllers if label in ig.index]
+    previous = ig.ids(kept) if kept else np.empty(0, dtype=np.int64)
+    controllers = previous.tolist()
+    if len(controllers) < len(state.controllers):
+        controllers, _ = farthest_first(ig, len(state.controllers), np.random.default_rng(seed), chosen=controllers)
+
+    controllers, latency, moved = local_search(ig, columns, controllers, previous, migration_cost, max_iters)
+    latency = int(latency) if ig.weights is None and np.isfinite(latency) else float(latency)
+    return PlacementState(ig, columns, ig.to_labels(controllers), latency, moved)
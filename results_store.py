@@ -0,0 +1,111 @@
+import json
+import sqlite3
+import time
+
+# One row per placement run; placement holds the controller labels as JSON
+COLUMNS = ('created_at', 'topology_type', 'num_nodes', 'num_switches', 'num_hosts', 'connection_prob',
+           'weighted', 'seed', 'k', 'strategy', 'objective', 'placement', 'max_latency', 'avg_latency',
+           'elapsed_ms')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created_at REAL NOT NULL,
+    topology_type TEXT NOT NULL,
+    num_nodes INTEGER NOT NULL,
+    num_switches INTEGER,
+    num_hosts INTEGER,
+    connection_prob REAL,
+    weighted INTEGER NOT NULL DEFAULT 0,
+    seed INTEGER,
+    k INTEGER NOT NULL,
+    strategy TEXT NOT NULL DEFAULT 'random',
+    objective TEXT NOT NULL DEFAULT 'max',
+    placement TEXT,
+    max_latency REAL,
+    avg_latency REAL,
+    elapsed_ms REAL
+);
+CREATE INDEX IF NOT EXISTS runs_topology_type ON runs (topology_type);
+CREATE INDEX IF NOT EXISTS runs_num_nodes ON runs (num_nodes);
+CREATE INDEX IF NOT EXISTS runs_k ON runs (k);
+CREATE INDEX IF NOT EXISTS runs_type_size_k ON runs (topology_type, num_nodes, k);
+"""
+
+DEFAULTS = {'weighted': False, 'strategy': 'random', 'objective': 'max'}
+
+# Rows buffered before ResultsStore writes them in one transaction
+BATCH_SIZE = 10000
+
+
+def _plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, 'item') else str(value)
+
+
+# Experiment results in SQLite. add() only buffers; rows are written with
+# executemany in a single transaction per batch (and on flush/close), so
+# recording millions of runs costs a few commits rather than one per run.
+class ResultsStore:
+    def __init__(self, path, batch_size=BATCH_SIZE):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('PRAGMA journal_mode=WAL')
+        self.connection.execute('PRAGMA synchronous=NORMAL')
+        self.connection.executescript(SCHEMA)
+        self.batch_size = batch_size
+        self.pending = []
+
+    def add(self, **run):
+        unknown = set(run) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown result fields: {sorted(unknown)}")
+        run = {**DEFAULTS, 'created_at': time.time(), **run}
+        if run.get('placement') is not None:
+            run['placement'] = json.dumps(list(run['placement']), default=_json_default)
+        # NumPy scalars become Python numbers; sqlite3 would store them as BLOBs
+        self.pending.append(tuple(_plain(run.get(column)) for column in COLUMNS))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def add_many(self, runs):
+        for run in runs:
+            self.add(**run)
+
+    def flush(self):
+        if not self.pending:
+            return
+        placeholders = ', '.join('?' * len(COLUMNS))
+        with self.connection:
+            self.connection.executemany(f"INSERT INTO runs ({', '.join(COLUMNS)}) VALUES ({placeholders})",
+                                        self.pending)
+        self.pending = []
+
+    def query(self, sql, params=()):
+        self.flush()
+        return self.connection.execute(sql, params).fetchall()
+
+    # Runs, mean/min/max max_latency and mean time per (type, size, k),
+    # optionally restricted to the given topology_type / num_nodes / k
+    def summary(self, topology_type=None, num_nodes=None, k=None):
+        filters = {'topology_type': topology_type, 'num_nodes': num_nodes, 'k': k}
+        filters = {column: value for column, value in filters.items() if value is not None}
+        where = ' AND '.join(f"{column} = ?" for column in filters)
+        return self.query(
+            "SELECT topology_type, num_nodes, k, COUNT(*), AVG(max_latency), MIN(max_latency),"
+            " MAX(max_latency), AVG(elapsed_ms) FROM runs"
+            + (f" WHERE {where}" if where else '')
+            + " GROUP BY topology_type, num_nodes, k ORDER BY topology_type, num_nodes, k",
+            tuple(filters.values()))
+
+    def close(self):
+        self.flush()
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
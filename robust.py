@@ -0,0 +1,98 @@
+import numpy as np
+
+import kernels
+from graph_index import IndexedGraph, index_graph
+from distance_matrix import csr_matrix, distance_matrix
+from placement import CHUNK_ELEMENTS, random_placements
+from topologies import LATENCY_RANGE
+
+try:
+    from scipy.sparse.csgraph import shortest_path
+except ImportError:
+    shortest_path = None
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+# Undirected edge id of every CSR entry, so one weight per link can be
+# expanded to both directions
+def edge_ids(ig):
+    src = np.repeat(np.arange(ig.num_nodes, dtype=np.int64), np.diff(ig.indptr))
+    dst = ig.indices.astype(np.int64)
+    keys = np.minimum(src, dst) * ig.num_nodes + np.maximum(src, dst)
+    _, ids = np.unique(keys, return_inverse=True)
+    return ids, ids.max() + 1 if ids.size else 0
+
+
+# S independent draws of every link's latency, uniform over latency_range
+# as in latency_Time.py; returns (S, nnz) CSR-ordered weights
+def sample_scenarios(ig, num_scenarios, rng, latency_range=LATENCY_RANGE):
+    ids, num_edges = edge_ids(ig)
+    return rng.uniform(*latency_range, size=(num_scenarios, num_edges))[:, ids]
+
+
+# (S, n, n) float32 distance matrices, one per scenario, all sharing the
+# graph's CSR structure: a single compiled call with numba, otherwise one
+# scipy call per scenario on a CSR matrix whose data is swapped in place
+def scenario_distances(ig, weights):
+    n = ig.num_nodes
+    if kernels.USE_NUMBA:
+        return kernels.batched_all_pairs_dijkstra(ig.indptr, ig.indices, np.ascontiguousarray(weights))
+    D = np.empty((len(weights), n, n), dtype=np.float32)
+    if csr_matrix is not None:
+        graph = csr_matrix((weights[0].copy(), ig.indices, ig.indptr), shape=(n, n))
+        for s, scenario in enumerate(weights):
+            graph.data[:] = scenario
+            D[s] = shortest_path(graph, method='D', directed=True)
+        return D
+    for s, scenario in enumerate(weights):
+        D[s] = distance_matrix(IndexedGraph(ig.labels, ig.node_type, ig.indptr, ig.indices, scenario))
+    return D
+
+
+# (S, P) max latency of every placement under every scenario, chunked over
+# placements so the (S, n, chunk, k) gather stays bounded
+def score_scenarios(D, placements):
+    num_scenarios, n, _ = D.shape
+    num_placements, k = placements.shape
+    scores = np.empty((num_scenarios, num_placements), dtype=D.dtype)
+    step = max(1, CHUNK_ELEMENTS // (num_scenarios * n * k))
+    for start in range(0, num_placements, step):
+        chunk = placements[start:start + step]
+        scores[:, start:start + step] = D[:, :, chunk].min(axis=3).max(axis=1)
+    return scores
+
+
+def risk(scores, measure):
+    if measure == 'mean':
+        return scores.mean(axis=0, dtype=np.float64)
+    if measure == 'worst':
+        return scores.max(axis=0).astype(np.float64)
+    if isinstance(measure, (int, float)):
+        return np.percentile(scores, measure, axis=0)
+    raise ValueError(f"Unknown risk measure: {measure}")
+
+
+# Placement robust to random link latencies: draws num_scenarios latency
+# assignments, computes every scenario's distance matrix, scores `trials`
+# random placements under all scenarios at once and keeps the one with the
+# lowest risk measure ('mean', 'worst' or a percentile such as 95). Returns
+# the controllers and the distribution of their max latency over scenarios.
+def place_controllers_robust(G, num_controllers, num_scenarios=200, trials=1000, measure='mean',
+                             latency_range=LATENCY_RANGE, seed=None):
+    ig = index_graph(G)
+    rng = np.random.default_rng(seed)
+    weights = sample_scenarios(ig, num_scenarios, rng, latency_range)
+    D = scenario_distances(ig, weights)
+
+    placements = random_placements(rng, ig.num_nodes, num_controllers, trials)
+    scores = score_scenarios(D, placements)
+    best = int(np.argmin(risk(scores, measure)))
+    latencies = scores[:, best].astype(np.float64)
+    report = {
+        'expected': float(latencies.mean()),
+        'std': float(latencies.std()),
+        'worst': float(latencies.max()),
+        'percentiles': {p: float(v) for p, v in zip(PERCENTILES, np.percentile(latencies, PERCENTILES))},
+    }
+    return ig.to_labels(placements[best]), report
@@ -0,0 +1,220 @@
+import heapq
+
+import numpy as np
+
+import kernels
+from graph_index import index_graph
+from distance_matrix import BLOCK_ROWS, csr_matrix, gather_edges, hop_dtype, nearest_source_distances, to_csgraph
+
+try:
+    from scipy.sparse.csgraph import dijkstra
+except ImportError:
+    dijkstra = None
+
+# Radii tried by place_controllers_threshold, as fractions of the way from
+# the farthest-first lower bound r / 2 to r
+GROW_STEPS = (0.0, 0.125, 0.25, 0.5)
+
+
+# Ball of every source node for one radius: the nodes within distance r of
+# sources[i] are nodes[indptr[i]:indptr[i + 1]], at distances dist[...],
+# and owners[j] is the source index of pair j. Nodes and owners are int32
+# and distances use the distance matrix width (uint8/uint16 hops, float32
+# weights). Built once at the largest radius of interest; within() then
+# narrows it to any smaller radius by filtering, without searching the
+# graph again.
+class CoverageSets:
+    def __init__(self, radius, sources, indptr, nodes, dist, owners):
+        self.radius = radius
+        self.sources = sources
+        self.indptr = indptr
+        self.nodes = nodes
+        self.dist = dist
+        self.owners = owners
+
+    def within(self, radius):
+        keep = self.dist <= radius
+        owners = self.owners[keep]
+        counts = np.bincount(owners, minlength=len(self.sources))
+        indptr = np.concatenate([[0], np.cumsum(counts)])
+        return CoverageSets(radius, self.sources, indptr, self.nodes[keep], self.dist[keep], owners)
+
+
+def _from_pairs(radius, sources, owners, nodes, dist):
+    order = np.argsort(owners, kind='stable')
+    counts = np.bincount(owners, minlength=len(sources))
+    indptr = np.concatenate([[0], np.cumsum(counts)])
+    return CoverageSets(radius, sources, indptr, nodes[order], dist[order], owners[order])
+
+
+# Level-synchronous BFS from a block of sources at a time, stopping after
+# `radius` levels. Visited (source, node) pairs are flags in a
+# (block, n) array, so memory stays BLOCK_ROWS * n whatever the graph size.
+def _bounded_bfs(ig, sources, radius, dtype):
+    n = ig.num_nodes
+    found_owners, found_nodes, found_dist = [], [], []
+    for start in range(0, len(sources), BLOCK_ROWS):
+        block = sources[start:start + BLOCK_ROWS]
+        visited = np.zeros(len(block) * n, dtype=bool)
+        owners = np.arange(len(block), dtype=np.int64)
+        frontier = block.astype(np.int64)
+        visited[owners * n + frontier] = True
+        level = 0
+        while frontier.size:
+            found_owners.append((owners + start).astype(np.int32))
+            found_nodes.append(frontier.astype(np.int32))
+            found_dist.append(np.full(len(frontier), level, dtype=dtype))
+            if level >= radius:
+                break
+            level += 1
+            _, offsets = gather_edges(ig.indptr, frontier)
+            counts = ig.indptr[frontier + 1] - ig.indptr[frontier]
+            keys = np.repeat(owners, counts) * n + ig.indices[offsets]
+            keys = np.unique(keys[~visited[keys]])
+            visited[keys] = True
+            owners, frontier = keys // n, keys % n
+    return np.concatenate(found_owners), np.concatenate(found_nodes), np.concatenate(found_dist)
+
+
+def _bounded_dijkstra(ig, sources, radius, dtype):
+    found_owners, found_nodes, found_dist = [], [], []
+    if csr_matrix is not None:
+        graph = to_csgraph(ig)
+        for start in range(0, len(sources), BLOCK_ROWS):
+            block = dijkstra(graph, directed=False, indices=sources[start:start + BLOCK_ROWS], limit=radius)
+            rows, cols = np.nonzero(block <= radius)
+            found_owners.append((rows + start).astype(np.int32))
+            found_nodes.append(cols.astype(np.int32))
+            found_dist.append(block[rows, cols].astype(dtype))
+        return np.concatenate(found_owners), np.concatenate(found_nodes), np.concatenate(found_dist)
+
+    indptr, indices, weights = ig.indptr, ig.indices, ig.weights
+    for i, source in enumerate(sources.tolist()):
+        dist = {source: 0.0}
+        heap = [(0.0, source)]
+        while heap:
+            d, u = heapq.heappop(heap)
+            if d > dist[u]:
+                continue
+            for j in range(indptr[u], indptr[u + 1]):
+                v = int(indices[j])
+                nd = d + weights[j]
+                if nd <= radius and nd < dist.get(v, np.inf):
+                    dist[v] = nd
+                    heapq.heappush(heap, (nd, v))
+        found_owners.append(np.full(len(dist), i, dtype=np.int32))
+        found_nodes.append(np.fromiter(dist.keys(), dtype=np.int32, count=len(dist)))
+        found_dist.append(np.fromiter(dist.values(), dtype=dtype, count=len(dist)))
+    return np.concatenate(found_owners), np.concatenate(found_nodes), np.concatenate(found_dist)
+
+
+# Hop-count balls with the numba kernels: one pass sizes them, a second
+# writes them straight into the final arrays, already grouped by source
+def _compiled_balls(ig, sources, radius):
+    hops = int(radius)
+    sizes = kernels.ball_sizes(ig.indptr, ig.indices, sources, hops)
+    indptr = np.concatenate([[0], np.cumsum(sizes)])
+    nodes = np.empty(indptr[-1], dtype=np.int32)
+    dist = np.empty(indptr[-1], dtype=hop_dtype(radius))
+    kernels.fill_balls(ig.indptr, ig.indices, sources, hops, indptr, nodes, dist)
+    owners = np.repeat(np.arange(len(sources), dtype=np.int32), sizes)
+    return CoverageSets(radius, sources, indptr, nodes, dist, owners)
+
+
+# Coverage sets of the given sources (default: every node) for radius r,
+# by truncated BFS (hop counts) or truncated Dijkstra (edge weights); no
+# shortest-path tree is grown past r
+def bounded_neighborhoods(ig, radius, sources=None):
+    sources = np.arange(ig.num_nodes) if sources is None else np.asarray(sources, dtype=np.int64)
+    if ig.weights is None and kernels.USE_NUMBA:
+        return _compiled_balls(ig, sources, radius)
+    if ig.weights is None:
+        owners, nodes, dist = _bounded_bfs(ig, sources, radius, hop_dtype(radius))
+    else:
+        owners, nodes, dist = _bounded_dijkstra(ig, sources, radius, np.float32)
+    return _from_pairs(radius, sources, owners, nodes, dist)
+
+
+# Greedy set cover over balls around every node. Each step takes the
+# uncovered node inside the fewest balls and, among the balls containing it
+# (its own ball's nodes, distances being symmetric), the one covering the
+# most uncovered nodes. Returns the chosen centres, or None if k balls do
+# not cover the graph.
+def greedy_cover(cover, num_controllers):
+    uncovered = np.ones(len(cover.sources), dtype=bool)
+    owners = cover.owners
+    covering = np.bincount(cover.nodes, minlength=len(cover.sources))
+    chosen = []
+    for _ in range(num_controllers):
+        target = np.flatnonzero(uncovered)[np.argmin(covering[uncovered])]
+        candidates = cover.nodes[cover.indptr[target]:cover.indptr[target + 1]]
+        gain = np.bincount(owners[uncovered[cover.nodes]], minlength=len(cover.sources))
+        best = int(candidates[np.argmax(gain[candidates])])
+        chosen.append(best)
+        uncovered[cover.nodes[cover.indptr[best]:cover.indptr[best + 1]]] = False
+        if not uncovered.any():
+            return chosen
+    return None
+
+
+# Farthest-first traversal: each new controller goes on the node farthest
+# from the current ones (unreachable nodes first). Extends `chosen` to k.
+def farthest_first(ig, num_controllers, rng, chosen=None):
+    chosen = list(chosen) if chosen else [int(rng.integers(ig.num_nodes))]
+    dist, _ = nearest_source_distances(ig, chosen)
+    while len(chosen) < min(num_controllers, ig.num_nodes):
+        chosen.append(int(np.argmax(np.where(np.isin(np.arange(ig.num_nodes), chosen), -1, dist))))
+        dist, _ = nearest_source_distances(ig, chosen)
+    return chosen, dist.max()
+
+
+def _as_latency(ig, value):
+    if ig.weights is None and np.isfinite(value):
+        return int(value)
+    return float(value)
+
+
+# Threshold placement without an APSP matrix. Farthest-first gives a
+# radius r that is at most twice optimal, so no placement beats r / 2.
+# Coverage sets are built at radii growing from r / 2 towards r (at the
+# GROW_STEPS fractions, smallest and cheapest first) until greedy set cover
+# meets them with k controllers; a binary search over the distances they
+# contain then narrows that radius down. The returned latency is exact
+# (one multi-source search).
+def place_controllers_threshold(G, num_controllers, weight=None, seed=None):
+    ig = index_graph(G, weight=weight)
+    rng = np.random.default_rng(seed)
+    best, best_latency = farthest_first(ig, num_controllers, rng)
+    if not np.isfinite(best_latency) or best_latency == 0:
+        return ig.to_labels(best), _as_latency(ig, best_latency)
+
+    lower = best_latency / 2
+    steps = lower + lower * np.array(GROW_STEPS)
+    if ig.weights is None:
+        steps = np.unique(np.ceil(steps))
+    found, failed = None, None
+    for radius in steps[steps < best_latency]:
+        cover = bounded_neighborhoods(ig, radius)
+        found = greedy_cover(cover, num_controllers)
+        if found is not None:
+            break
+        failed = radius
+
+    if found is not None:
+        radii = np.unique(cover.dist)
+        if failed is not None:
+            radii = radii[radii > failed]
+        lo, hi = 0, len(radii) - 2
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            step = cover.within(radii[mid])
+            chosen = greedy_cover(step, num_controllers)
+            if chosen is None:
+                lo = mid + 1
+            else:
+                found, cover = chosen, step
+                hi = mid - 1
+        controllers, latency = farthest_first(ig, num_controllers, rng, chosen=found)
+        if latency < best_latency:
+            best, best_latency = controllers, latency
+    return ig.to_labels(best), _as_latency(ig, best_latency)
@@ -0,0 +1,66 @@
+import numpy as np
+
+from graph_index import HOST, SWITCH, from_edges
+
+TOPOLOGY_TYPES = ('ring', 'star', 'bus', 'erdos_renyi')
+
+# Same link latency range as latency_Time.py
+LATENCY_RANGE = (1.0, 10.0)
+
+
+def _switch_edges(topology_type, num_switches, rng, connection_prob):
+    switches = np.arange(num_switches)
+    if topology_type == 'ring':
+        return switches, (switches + 1) % num_switches
+    if topology_type == 'star':
+        return np.zeros(num_switches - 1, dtype=np.int64), switches[1:]
+    if topology_type == 'bus':
+        return switches[:-1], switches[1:]
+    if topology_type == 'erdos_renyi':
+        src, dst = np.triu_indices(num_switches, k=1)
+        keep = rng.random(len(src)) < connection_prob
+        src, dst = src[keep], dst[keep]
+        # Ensure the switch graph is connected: link each component to a
+        # random node of the ones before it
+        labels = _components(num_switches, src, dst)
+        extra_src, extra_dst = [], []
+        for component in range(1, labels.max() + 1):
+            extra_src.append(rng.choice(np.flatnonzero(labels == component)))
+            extra_dst.append(rng.choice(np.flatnonzero(labels < component)))
+        return np.concatenate([src, extra_src]).astype(np.int64), np.concatenate([dst, extra_dst]).astype(np.int64)
+    raise ValueError(f"Unknown topology type: {topology_type}")
+
+
+def _components(n, src, dst):
+    parent = np.arange(n)
+
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for u, v in zip(src.tolist(), dst.tolist()):
+        ru, rv = find(u), find(v)
+        if ru != rv:
+            parent[max(ru, rv)] = min(ru, rv)
+    roots = np.array([find(x) for x in range(n)])
+    return np.unique(roots, return_inverse=True)[1]
+
+
+# Random switch/host topology built straight into an IndexedGraph, matching
+# the generators in latency_Time.py / random_num.py: switches are ids
+# 0..num_switches-1 and every host hangs off a random switch. With
+# weighted=True every link gets a uniform `latency` draw.
+def generate_topology(topology_type, num_switches, num_hosts, rng, connection_prob=0.1, weighted=False):
+    src, dst = _switch_edges(topology_type, num_switches, rng, connection_prob)
+    hosts = np.arange(num_switches, num_switches + num_hosts)
+    src = np.concatenate([src, hosts])
+    dst = np.concatenate([dst, rng.integers(num_switches, size=num_hosts)])
+
+    weights = rng.uniform(*LATENCY_RANGE, size=len(src)) if weighted else None
+    labels = np.empty(num_switches + num_hosts, dtype=object)
+    labels[:] = range(num_switches + num_hosts)
+    node_type = np.full(len(labels), HOST, dtype=np.uint8)
+    node_type[:num_switches] = SWITCH
+    return from_edges(labels, node_type, src, dst, weights)
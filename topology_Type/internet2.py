@@ -1,7 +1,14 @@
 import networkx as nx
 import numpy as np
 import random
-import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from geo import propagation_delay_ms
+from graph_index import index_graph
+from placement import place_controllers
+from rendering import render_topology
 
 # Step 1: Define the Network Topology Functions
 def create_ring_topology(num_switches, num_hosts):
@@ -71,12 +78,29 @@ def create_erdos_renyi_topology(num_switches, num_hosts, connection_prob):
     
     return G
 
+# Backbone node coordinates (latitude, longitude)
+INTERNET2_COORDINATES = {
+    'Seattle': (47.6062, -122.3321),
+    'Sunnyvale': (37.3688, -122.0363),
+    'Salt Lake City': (40.7608, -111.8910),
+    'Denver': (39.7392, -104.9903),
+    'Kansas City': (39.0997, -94.5786),
+    'Chicago': (41.8781, -87.6298),
+    'Houston': (29.7604, -95.3698),
+    'Atlanta': (33.7490, -84.3880),
+    'Washington DC': (38.9072, -77.0369),
+    'New York City': (40.7128, -74.0060),
+}
+
+# Host access links are metro-local
+HOST_LATENCY_MS = 0.1
+HOST_OFFSET_DEG = 1.5
+
 def create_internet2_topology():
     G = nx.Graph()
     
     # Internet2 core nodes (representing major backbone locations)
-    core_nodes = ['Seattle', 'Sunnyvale', 'Salt Lake City', 'Denver', 'Kansas City', 'Chicago', 
-                  'Houston', 'Atlanta', 'Washington DC', 'New York City']
+    core_nodes = list(INTERNET2_COORDINATES)
     
     # Connections between the core nodes based on typical Internet2 backbone structure
     edges = [
@@ -86,47 +110,29 @@ def create_internet2_topology():
         ('Houston', 'Atlanta'), ('Atlanta', 'Washington DC'), ('Washington DC', 'New York City')
     ]
     
-    G.add_nodes_from(core_nodes)
-    G.add_edges_from(edges)
+    # Positions are (longitude, latitude) so they double as the plot layout
+    for node in core_nodes:
+        lat, lon = INTERNET2_COORDINATES[node]
+        G.add_node(node, type='switch', pos=(lon, lat))
+    
+    # Propagation delay over the great-circle distance between cities
+    for u, v in edges:
+        latency = propagation_delay_ms(*INTERNET2_COORDINATES[u], *INTERNET2_COORDINATES[v])
+        G.add_edge(u, v, latency=float(latency))
     
     # Adding hosts connected to the core nodes
     num_hosts_per_node = 4
     for node in core_nodes:
+        lat, lon = INTERNET2_COORDINATES[node]
         for i in range(num_hosts_per_node):
             host = f"{node}_host_{i}"
-            G.add_edge(node, host)
+            angle = 2 * np.pi * i / num_hosts_per_node
+            pos = (lon + HOST_OFFSET_DEG * np.cos(angle), lat + HOST_OFFSET_DEG * np.sin(angle))
+            G.add_node(host, type='host', pos=pos)
+            G.add_edge(node, host, latency=HOST_LATENCY_MS)
     
     return G
 
-# Step 2: Compute Latencies
-def compute_latencies(G):
-    return dict(nx.all_pairs_shortest_path_length(G))
-
-# Step 3: Place Controllers
-def place_controllers(G, num_controllers):
-    all_nodes = list(G.nodes)
-    best_placement = None
-    min_max_latency = float('inf')
-
-    # Heuristic: Randomly select controller placements and evaluate
-    for _ in range(1000):
-        controllers = random.sample(all_nodes, num_controllers)
-        max_latency = compute_max_latency(G, controllers)
-        
-        if max_latency < min_max_latency:
-            min_max_latency = max_latency
-            best_placement = controllers
-
-    return best_placement, min_max_latency
-
-def compute_max_latency(G, controllers):
-    latencies = compute_latencies(G)
-    max_latency = 0
-    for node in G.nodes:
-        min_latency_to_controller = min(latencies[node][controller] for controller in controllers)
-        max_latency = max(max_latency, min_latency_to_controller)
-    return max_latency
-
 # Simulation Parameters
 num_switches = 10
 num_hosts = 40
@@ -148,18 +154,15 @@ elif topology_type == 'internet2':
     G = create_internet2_topology()
 
 # Simulation Execution
-controllers, min_max_latency = place_controllers(G, num_controllers)
+weight = 'latency' if topology_type == 'internet2' else None
+ig = index_graph(G, weight=weight)
+controllers, min_max_latency = place_controllers(ig, num_controllers)
 
 print("Optimal Controller Placement:", controllers)
 print("Minimum Maximum Latency:", min_max_latency)
 
 # Visualization
-pos = nx.spring_layout(G)
-switch_nodes = [node for node in G.nodes if 'host' not in node]
-host_nodes = [node for node in G.nodes if 'host' in node]
-
-nx.draw(G, pos, with_labels=True, node_color='lightblue', node_size=500, font_size=10)
-nx.draw_networkx_nodes(G, pos, nodelist=switch_nodes, node_color='blue', node_size=500)
-nx.draw_networkx_nodes(G, pos, nodelist=host_nodes, node_color='green', node_size=300)
-nx.draw_networkx_nodes(G, pos, nodelist=controllers, node_color='red', node_size=700)
-plt.show()
+pos = nx.get_node_attributes(G, 'pos') or None
+path = render_topology(ig, controllers, f"{topology_type}_placement.png",
+                       topology_type=topology_type, pos=pos)
+print("Saved Visualization:", path)
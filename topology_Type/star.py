@@ -1,7 +1,12 @@
 import networkx as nx
 import numpy as np
 import random
-import matplotlib.pyplot as plt
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from placement import place_controllers
+from rendering import render_topology
 
 # Step 1: Define the Network Topology Functions
 def create_ring_topology(num_switches, num_hosts):
@@ -72,35 +77,6 @@ def create_erdos_renyi_topology(num_switches, num_hosts, connection_prob):
     
     return G
 
-# Step 2: Compute Latencies
-def compute_latencies(G):
-    return dict(nx.all_pairs_shortest_path_length(G))
-
-# Step 3: Place Controllers
-def place_controllers(G, num_controllers):
-    all_nodes = list(G.nodes)
-    best_placement = None
-    min_max_latency = float('inf')
-
-    # Heuristic: Randomly select controller placements and evaluate
-    for _ in range(1000):
-        controllers = random.sample(all_nodes, num_controllers)
-        max_latency = compute_max_latency(G, controllers)
-        
-        if max_latency < min_max_latency:
-            min_max_latency = max_latency
-            best_placement = controllers
-
-    return best_placement, min_max_latency
-
-def compute_max_latency(G, controllers):
-    latencies = compute_latencies(G)
-    max_latency = 0
-    for node in G.nodes:
-        min_latency_to_controller = min(latencies[node][controller] for controller in controllers)
-        max_latency = max(max_latency, min_latency_to_controller)
-    return max_latency
-
 # Simulation Parameters
 num_switches = 10
 num_hosts = 40
@@ -126,12 +102,6 @@ print("Optimal Controller Placement:", controllers)
 print("Minimum Maximum Latency:", min_max_latency)
 
 # Visualization
-pos = nx.spring_layout(G)
-switch_nodes = [node for node in range(num_switches)]
-host_nodes = [node for node in range(num_switches, num_switches + num_hosts)]
-
-nx.draw(G, pos, with_labels=True, node_color='lightblue', node_size=500, font_size=10)
-nx.draw_networkx_nodes(G, pos, nodelist=switch_nodes, node_color='blue', node_size=500)
-nx.draw_networkx_nodes(G, pos, nodelist=host_nodes, node_color='green', node_size=300)
-nx.draw_networkx_nodes(G, pos, nodelist=controllers, node_color='red', node_size=700)
-plt.show()
\ No newline at end of file
+path = render_topology(G, controllers, f"{topology_type}_placement.png",
+                       topology_type=topology_type, hosts=range(num_switches, num_switches + num_hosts))
+print("Saved Visualization:", path)
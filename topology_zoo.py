@@ -0,0 +1,168 @@
+import glob
+import json
+import os
+import re
+import shutil
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from geo import propagation_delay_ms
+from graph_index import SWITCH, IndexedGraph, from_edges
+
+# Bump when the compiled layout changes so stale caches are rebuilt
+CACHE_VERSION = 1
+
+DELAY_ATTRIBUTES = ('delay', 'Delay', 'LinkDelay', 'latency')
+DELAY_PATTERN = re.compile(r'([0-9]*\.?[0-9]+)\s*(ms|us|µs|s)?', re.IGNORECASE)
+DELAY_UNITS_MS = {None: 1.0, 'ms': 1.0, 'us': 1e-3, 'µs': 1e-3, 's': 1e3}
+
+ARRAYS = ('indptr', 'indices', 'weights', 'node_type', 'coords')
+
+
+def _parse_delay(text):
+    match = DELAY_PATTERN.search(text or '')
+    if match is None:
+        return None
+    unit = match.group(2).lower() if match.group(2) else None
+    return float(match.group(1)) * DELAY_UNITS_MS[unit]
+
+
+def _float(text):
+    try:
+        return float(text)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+# Stream the GraphML once, keeping only node labels/coordinates and link delays
+def parse_graphml(path):
+    keys = {}
+    nodes = []
+    edges = []
+    for _, elem in ET.iterparse(path, events=('end',)):
+        tag = elem.tag.rsplit('}', 1)[-1]
+        if tag == 'key':
+            keys[elem.get('id')] = elem.get('attr.name')
+        elif tag in ('node', 'edge'):
+            attrs = {keys.get(data.get('key')): data.text for data in elem if data.tag.endswith('data')}
+            if tag == 'node':
+                nodes.append((elem.get('id'), attrs))
+            else:
+                edges.append((elem.get('source'), elem.get('target'), attrs))
+            elem.clear()
+    return nodes, edges
+
+
+# Compile a GraphML topology to CSR arrays plus labels and coordinates.
+# Link delay comes from a delay attribute when present, otherwise from the
+# great-circle distance between endpoints, otherwise the median known delay.
+def compile_graphml(path):
+    nodes, edges = parse_graphml(path)
+    index = {node_id: i for i, (node_id, _) in enumerate(nodes)}
+    names = [attrs.get('label') or node_id for node_id, attrs in nodes]
+    seen = {}
+    for name in names:
+        seen[name] = seen.get(name, 0) + 1
+    labels = [name if seen[name] == 1 else f"{name}_{node_id}" for name, (node_id, _) in zip(names, nodes)]
+    coords = np.array([(_float(attrs.get('Latitude')), _float(attrs.get('Longitude'))) for _, attrs in nodes],
+                      dtype=np.float64).reshape(-1, 2)
+
+    # Parallel links collapse to the fastest one; self-loops are dropped
+    links = {}
+    for source, target, attrs in edges:
+        u, v = sorted((index[source], index[target]))
+        if u == v:
+            continue
+        delay = next((_parse_delay(attrs[name]) for name in DELAY_ATTRIBUTES if attrs.get(name)), None)
+        if delay is None:
+            delay = float(propagation_delay_ms(*coords[u], *coords[v]))
+        if not np.isfinite(delay):
+            delay = np.inf
+        links[u, v] = min(delay, links.get((u, v), np.inf))
+
+    pairs = np.array(list(links), dtype=np.int32).reshape(-1, 2)
+    weights = np.array(list(links.values()), dtype=np.float64)
+    known = np.isfinite(weights)
+    weights[~known] = np.median(weights[known]) if known.any() else 1.0
+
+    node_type = np.full(len(nodes), SWITCH, dtype=np.uint8)
+    ig = from_edges(np.array(labels, dtype=object), node_type, pairs[:, 0], pairs[:, 1], weights)
+    return ig, coords
+
+
+def _cache_path(path, cache_dir):
+    cache_dir = cache_dir or os.path.join(os.path.dirname(os.path.abspath(path)), '.cache')
+    return os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0])
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'version': CACHE_VERSION, 'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _cache_valid(path, target):
+    try:
+        with open(os.path.join(target, 'meta.json')) as f:
+            return json.load(f) == _source_stamp(path)
+    except (OSError, ValueError):
+        return False
+
+
+def write_cache(path, target):
+    ig, coords = compile_graphml(path)
+    staging = target + '.tmp'
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    arrays = {'indptr': ig.indptr, 'indices': ig.indices, 'weights': ig.weights,
+              'node_type': ig.node_type, 'coords': coords}
+    for name in ARRAYS:
+        np.save(os.path.join(staging, name + '.npy'), arrays[name])
+    with open(os.path.join(staging, 'labels.json'), 'w') as f:
+        json.dump([str(label) for label in ig.labels], f)
+    # meta.json is written last: its presence marks a complete cache
+    with open(os.path.join(staging, 'meta.json'), 'w') as f:
+        json.dump(_source_stamp(path), f)
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(staging, target)
+
+
+def read_cache(target):
+    arrays = {name: np.load(os.path.join(target, name + '.npy'), mmap_mode='r') for name in ARRAYS}
+    with open(os.path.join(target, 'labels.json')) as f:
+        labels = np.array(json.load(f), dtype=object)
+    ig = IndexedGraph(labels, arrays['node_type'], arrays['indptr'], arrays['indices'], arrays['weights'])
+    return ig, arrays['coords']
+
+
+def ensure_cache(path, cache_dir=None):
+    target = _cache_path(path, cache_dir)
+    if not _cache_valid(path, target):
+        write_cache(path, target)
+    return target
+
+
+def _ensure_cache(args):
+    return ensure_cache(*args)
+
+
+# Load a Topology Zoo GraphML file as an IndexedGraph with `latency` weights
+# (ms) and (lat, lon) coordinates. The first read compiles it to .npy arrays
+# under cache_dir (default: .cache next to the file); later reads memory-map
+# those instead of parsing XML. The cache is rebuilt if the file changes.
+def load_topology(path, cache_dir=None):
+    return read_cache(ensure_cache(path, cache_dir))
+
+
+# Compile every stale GraphML file of a directory in parallel, then yield
+# (name, graph, coords) for each topology from the memory-mapped caches
+def iter_topologies(directory, cache_dir=None, workers=None):
+    paths = sorted(glob.glob(os.path.join(directory, '*.graphml')))
+    stale = [path for path in paths if not _cache_valid(path, _cache_path(path, cache_dir))]
+    if stale:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(_ensure_cache, [(path, cache_dir) for path in stale]))
+    for path in paths:
+        ig, coords = read_cache(_cache_path(path, cache_dir))
+        yield os.path.splitext(os.path.basename(path))[0], ig, coords